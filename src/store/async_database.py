@@ -0,0 +1,158 @@
+"""Asyncio wrapper around the Signex SQLite database."""
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from src.store.database import SEARCH_CANDIDATES, Database
+from src.store.models import SensorItem
+
+T = TypeVar("T")
+
+
+class AsyncDatabase:
+    """Coroutine counterpart of Database for asyncio sensor pipelines.
+
+    Every call runs on one dedicated worker thread that owns the SQLite
+    connection, so commits never block the event loop and fetches keep
+    running while items are written.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/signex.db",
+        dedup: bool = True,
+        compress: bool = False,
+        health_flush_interval: float = 5.0,
+        instrument: bool = False,
+        slow_query_ms: float = 100.0
+    ):
+        self.db = Database(
+            db_path,
+            dedup=dedup,
+            compress=compress,
+            health_flush_interval=health_flush_interval,
+            instrument=instrument,
+            slow_query_ms=slow_query_ms,
+        )
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        if not self._executor:
+            raise RuntimeError("Database not initialized. Call init() first.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def init(self):
+        """Initialize database schema."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signex-db")
+        await self._run(self.db.init)
+
+    async def save_items(self, items: list[SensorItem], watch_name: str | None = None) -> dict:
+        """See Database.save_items."""
+        return await self._run(self.db.save_items, items, watch_name)
+
+    async def save_items_bulk(
+        self,
+        batches: Iterable[SensorItem] | Iterable[Iterable[SensorItem]],
+        watch_name: str | None = None
+    ) -> dict:
+        """See Database.save_items_bulk."""
+        return await self._run(self.db.save_items_bulk, batches, watch_name)
+
+    async def get_items(
+        self,
+        source: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        watch_name: str | None = None,
+        canonical_only: bool = False
+    ) -> list[dict[str, Any]]:
+        """See Database.get_items."""
+        return await self._run(self.db.get_items, source, since, until, watch_name, canonical_only)
+
+    async def iter_items(self, chunk_size: int = 500, **filters) -> AsyncIterator[dict[str, Any]]:
+        """Async iteration over Database.iter_items, one page per worker call.
+
+        Usage:
+            async for item in db.iter_items(watch_name="ai-tools", columns=["title", "url"]):
+                ...
+        """
+        rows = await self._run(self.db.iter_items, chunk_size=chunk_size, **filters)
+        while True:
+            page = await self._run(lambda: list(itertools.islice(rows, chunk_size)))
+            for row in page:
+                yield row
+            if len(page) < chunk_size:
+                return
+
+    async def search_items(
+        self,
+        query: str,
+        watch_name: str | None = None,
+        since: str | None = None,
+        limit: int = 20,
+        max_candidates: int | None = SEARCH_CANDIDATES
+    ) -> list[dict[str, Any]]:
+        """See Database.search_items."""
+        return await self._run(self.db.search_items, query, watch_name, since, limit, max_candidates)
+
+    async def archive_items(
+        self,
+        policy: dict[str, int] | None = None,
+        default_days: int | None = None
+    ) -> dict[str, int]:
+        """See Database.archive_items."""
+        return await self._run(self.db.archive_items, policy, default_days)
+
+    async def save_analysis(
+        self,
+        watch_name: str,
+        item_ids: list[int],
+        report_path: str,
+        item_count: int,
+        lens: str
+    ) -> int:
+        """See Database.save_analysis."""
+        return await self._run(self.db.save_analysis, watch_name, item_ids, report_path, item_count, lens)
+
+    async def get_run_stats(
+        self,
+        since: str | None = None,
+        until: str | None = None,
+        watch_name: str | None = None
+    ) -> dict[str, Any]:
+        """See Database.get_run_stats."""
+        return await self._run(self.db.get_run_stats, since, until, watch_name)
+
+    async def update_source_health(self, source: str, success: bool, latency: float | None = None) -> None:
+        """See Database.update_source_health."""
+        await self._run(self.db.update_source_health, source, success, latency)
+
+    async def flush_source_health(self) -> None:
+        """See Database.flush_source_health."""
+        await self._run(self.db.flush_source_health)
+
+    async def get_source_health(self) -> list[dict[str, Any]]:
+        """See Database.get_source_health."""
+        return await self._run(self.db.get_source_health)
+
+    def metrics(self, reset: bool = False) -> dict[str, Any]:
+        """See Database.metrics. Safe to call from the event loop."""
+        return self.db.metrics(reset)
+
+    async def close(self):
+        """Close database connection and stop the worker thread."""
+        if self._executor:
+            await self._run(self.db.close)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        await self.init()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
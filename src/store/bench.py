@@ -0,0 +1,687 @@
+"""Storage benchmarks for Signex.
+
+Usage:
+    uv run python -m src.store.bench [--sizes 1000,10000,100000] [--workers 1,4,16] [--search 300000]
+    uv run python -m src.store.bench --sizes 1000 --async-sensors 20
+    uv run python -m src.store.bench --plans
+    uv run python -m src.store.bench --suite 10000,100000,1000000 --json bench.json [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.store import rollups
+from src.store.async_database import AsyncDatabase
+from src.store.database import ITEM_COLUMNS, SEARCH_CANDIDATES, Database
+from src.store.models import SensorItem
+
+SOURCES = [
+    "hacker_news", "github_trending", "reddit", "rss", "tavily",
+    "brave", "exa", "x", "v2ex", "product_hunt",
+]
+
+
+# Common words plus a long tail of rarer terms, weighted roughly by Zipf's
+# law so term frequencies look like real text.
+WORDS = ["agent", "model", "release", "open", "source", "coding", "tool",
+         "benchmark", "startup", "funding", "launch", "api", "latency"]
+WORDS += [f"term{i}" for i in range(20000)]
+_WORD_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(WORDS))))
+
+
+def make_items(count: int, seed: int = 0, content_size: int = 800) -> list[SensorItem]:
+    """Generate a synthetic corpus of sensor items."""
+    rng = random.Random(seed)
+    items = []
+
+    for i in range(count):
+        source = SOURCES[i % len(SOURCES)]
+        words = rng.choices(WORDS, cum_weights=_WORD_WEIGHTS, k=content_size // 7 + 8)
+        items.append(SensorItem(
+            source=source,
+            source_id=f"{source}-{seed}-{i}",
+            title=" ".join(words[:8]),
+            url=f"https://example.com/{source}/{i}",
+            content=" ".join(words[8:]),
+            metadata={"score": rng.randint(0, 500), "rank": i},
+        ))
+
+    return items
+
+
+# (content length, share): feed summaries, posts, scraped full pages
+CONTENT_SIZES = ((300, 0.6), (1500, 0.3), (8000, 0.1))
+
+
+def make_corpus(
+    rows: int,
+    seed: int = 0,
+    duplicate_ratio: float = 0.2,
+    batch_size: int = 10000
+) -> Iterator[list[SensorItem]]:
+    """Generate a realistic corpus in batches, so large ones stream.
+
+    Content lengths follow CONTENT_SIZES, and duplicate_ratio of the items
+    repeat the title and body of a recent item under another source, as
+    when several sensors pick up the same article. Same seed, same corpus.
+    """
+    rng = random.Random(seed)
+    sizes, shares = zip(*CONTENT_SIZES)
+    recent: list[tuple[str, str]] = []
+
+    for start in range(0, rows, batch_size):
+        batch = []
+        for i in range(start, min(rows, start + batch_size)):
+            source = SOURCES[i % len(SOURCES)]
+            if recent and rng.random() < duplicate_ratio:
+                title, content = rng.choice(recent)
+            else:
+                size = rng.choices(sizes, shares)[0]
+                words = rng.choices(WORDS, cum_weights=_WORD_WEIGHTS, k=size // 7 + 8)
+                title, content = " ".join(words[:8]), " ".join(words[8:])
+                recent.append((title, content))
+                if len(recent) > 1000:
+                    recent.pop(rng.randrange(len(recent)))
+            batch.append(SensorItem(
+                source=source,
+                source_id=f"{source}-{seed}-{i}",
+                title=title,
+                url=f"https://example.com/{source}/{seed}/{i}",
+                content=content,
+                metadata={"score": rng.randint(0, 500), "rank": i},
+            ))
+        yield batch
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_save_items(sizes: list[int]) -> list[dict]:
+    """Compare the per-row save_items loop with save_items_bulk.
+
+    Each size runs a fresh insert followed by a re-insert of the same batch,
+    which is all duplicates. The last row repeats save_items_bulk with
+    near-duplicate detection off, so the difference is what dedup costs.
+    """
+    results = []
+
+    for size in sizes:
+        items = make_items(size)
+        for method, dedup in (("save_items", True), ("save_items_bulk", True), ("save_items_bulk", False)):
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(str(Path(tmp) / "bench.db"), dedup=dedup)
+                db.init()
+                save = getattr(db, method)
+                fresh = _timed(lambda: save(items, watch_name="bench"))
+                dup = _timed(lambda: save(items, watch_name="bench"))
+                db.close()
+            results.append({
+                "op": method if dedup else f"{method} (no dedup)",
+                "rows": size,
+                "fresh_s": fresh,
+                "dup_s": dup,
+                "rows_per_s": size / fresh if fresh else 0.0,
+            })
+
+    return results
+
+
+def bench_concurrent(workers: list[int], items_per_worker: int = 2000, batch: int = 50) -> list[dict]:
+    """Stress concurrent sensor writers against one database.
+
+    Every worker thread saves its own items in small batches, records source
+    health after each batch and reads the health table back, the way parallel
+    sensors do. Reports throughput, lost items and lock errors per mode.
+    """
+    results = []
+
+    for count in workers:
+        for concurrent in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = str(Path(tmp) / "bench.db")
+                errors: list[str] = []
+                shared = Database(path, concurrent=concurrent)
+                shared.init()
+
+                def sensor(worker: int):
+                    # Without the writer queue each thread needs its own handle.
+                    db = shared if concurrent else Database(path)
+                    if not concurrent:
+                        db.init()
+                    items = make_items(items_per_worker, seed=worker, content_size=200)
+                    for item in items:
+                        item.source_id = f"w{worker}-{item.source_id}"
+                    try:
+                        for start in range(0, len(items), batch):
+                            db.save_items(items[start:start + batch], watch_name="bench")
+                            db.update_source_health(items[start].source, True)
+                            db.get_source_health()
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+                    finally:
+                        if not concurrent:
+                            db.close()
+
+                threads = [threading.Thread(target=sensor, args=(i,)) for i in range(count)]
+                start = time.perf_counter()
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                elapsed = time.perf_counter() - start
+
+                stored = shared.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+                shared.close()
+
+            expected = count * items_per_worker
+            results.append({
+                "op": "concurrent" if concurrent else "per-thread",
+                "rows": expected,
+                "workers": count,
+                "elapsed_s": elapsed,
+                "rows_per_s": stored / elapsed if elapsed else 0.0,
+                "lost": expected - stored,
+                "errors": len(errors),
+            })
+
+    return results
+
+
+def bench_async(sensors: int, rounds: int = 5, batch: int = 50, fetch_latency: float = 0.3) -> list[dict]:
+    """Compare blocking Database calls with AsyncDatabase in an asyncio runner.
+
+    Each sensor coroutine fetches a page, hands it off for persisting along
+    with its source health, and goes on to fetch the next page. A fetch is
+    simulated as ten network round trips totalling fetch_latency, each
+    needing a turn of the event loop the way an httpx request does. Blocking
+    calls stall every in-flight fetch; AsyncDatabase lets them overlap.
+    """
+    results = []
+
+    async def run(use_async: bool) -> float:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "bench.db")
+            db = AsyncDatabase(path) if use_async else Database(path)
+            if use_async:
+                await db.init()
+            else:
+                db.init()
+
+            corpus = [make_items(rounds * batch, seed=n, content_size=400) for n in range(sensors)]
+            for n, items in enumerate(corpus):
+                for item in items:
+                    item.source_id = f"s{n}-{item.source_id}"
+
+            async def persist(chunk: list[SensorItem]):
+                await db.save_items(chunk, watch_name="bench")
+                await db.update_source_health(chunk[0].source, True)
+
+            async def sensor(n: int):
+                pending = []
+                for r in range(rounds):
+                    for _ in range(10):
+                        await asyncio.sleep(fetch_latency / 10)
+                    chunk = corpus[n][r * batch:(r + 1) * batch]
+                    if use_async:
+                        pending.append(asyncio.create_task(persist(chunk)))
+                    else:
+                        db.save_items(chunk, watch_name="bench")
+                        db.update_source_health(chunk[0].source, True)
+                await asyncio.gather(*pending)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(sensor(n) for n in range(sensors)))
+            elapsed = time.perf_counter() - start
+
+            if use_async:
+                await db.close()
+            else:
+                db.close()
+        return elapsed
+
+    for use_async in (False, True):
+        elapsed = asyncio.run(run(use_async))
+        results.append({
+            "op": "AsyncDatabase" if use_async else "Database (blocking)",
+            "sensors": sensors,
+            "rows": sensors * rounds * batch,
+            "elapsed_s": elapsed,
+        })
+
+    return results
+
+
+def bench_search(rows: int, queries: int = 50) -> dict:
+    """Measure search_items latency, and what the search index costs ingest.
+
+    Queries come in four kinds, since the cost of BM25 ranking follows the
+    number of matches: rare terms, pairs of rare terms, common terms (which
+    match most of the corpus) and pairs of common terms. Each kind runs
+    with the default candidate cap and uncapped. Ingest is timed for the
+    first 10k items with and without the search triggers.
+    """
+    rng = random.Random(1)
+    common = WORDS[:13]
+    kinds = {
+        "rare": lambda: rng.choice(WORDS[100:2000]),
+        "rare AND rare": lambda: f"{rng.choice(WORDS[100:2000])} AND {rng.choice(WORDS[100:2000])}",
+        "common": lambda: rng.choice(common),
+        "common pair": lambda: " ".join(rng.sample(common, 2)),
+    }
+    first = make_items(min(10000, rows), seed=0, content_size=400)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "unindexed.db"), dedup=False)
+        db.init()
+        for trigger in ("items_fts_insert", "items_fts_delete", "items_fts_update"):
+            db.connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        unindexed = _timed(lambda: db.save_items_bulk(first))
+        db.close()
+
+        db = Database(str(Path(tmp) / "bench.db"), dedup=False)
+        db.init()
+        indexed = _timed(lambda: db.save_items_bulk(first))
+        for start in range(10000, rows, 10000):
+            db.save_items_bulk(make_items(min(10000, rows - start), seed=start, content_size=400))
+
+        latency: dict[str, dict[str, float]] = {}
+        for kind, make_query in kinds.items():
+            for cap in (SEARCH_CANDIDATES, None):
+                times = []
+                for _ in range(queries):
+                    query = make_query()
+                    times.append(_timed(lambda: db.search_items(query, limit=20, max_candidates=cap)))
+                times.sort()
+                latency[kind if cap else f"{kind} (uncapped)"] = {
+                    "p50_ms": times[len(times) // 2] * 1000,
+                    "p95_ms": times[int(len(times) * 0.95)] * 1000,
+                    "max_ms": times[-1] * 1000,
+                }
+        db.close()
+
+    return {
+        "rows": rows,
+        "ingest_items": len(first),
+        "ingest_s": indexed,
+        "ingest_unindexed_s": unindexed,
+        "latency": latency,
+    }
+
+
+def bench_storage(rows: int, duplicate_ratio: float = 0.2, reads: int = 3) -> list[dict]:
+    """Compare file size and read latency of plain and compressed storage.
+
+    See make_corpus for the corpus.
+    """
+    items = [item for batch in make_corpus(rows, seed=2, duplicate_ratio=duplicate_ratio) for item in batch]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for compress in (False, True):
+            path = Path(tmp) / f"storage-{compress}.db"
+            db = Database(str(path), compress=compress)
+            db.init()
+            write = _timed(lambda: [
+                db.save_items_bulk(items[i:i + 10000]) for i in range(0, len(items), 10000)
+            ])
+            db.connection.execute("VACUUM")
+
+            timings = {
+                "get_items": lambda: db.get_items(),
+                "iter_items(title,url)": lambda: sum(1 for _ in db.iter_items(columns=["title", "url"])),
+                "iter_items(all)": lambda: sum(1 for _ in db.iter_items()),
+            }
+            result = {
+                "storage": "compressed" if compress else "plain",
+                "rows": rows,
+                "file_mb": path.stat().st_size / 2**20,
+                "write_s": write,
+            }
+            for name, fn in timings.items():
+                result[name] = min(_timed(fn) for _ in range(reads)) * 1000
+            db.close()
+            results.append(result)
+
+    return results
+
+
+def bench_health(calls: int, sources: int = 20) -> list[dict]:
+    """Compare per-call and buffered update_source_health throughput."""
+    rng = random.Random(3)
+    events = [
+        (f"sensor-{i % sources}", rng.random() < 0.9, rng.lognormvariate(-2, 1))
+        for i in range(calls)
+    ]
+
+    results = []
+    for interval in (0.0, 5.0):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(str(Path(tmp) / "bench.db"), health_flush_interval=interval)
+            db.init()
+            elapsed = _timed(lambda: [db.update_source_health(*event) for event in events])
+            read = _timed(db.get_source_health)
+            db.close()
+        results.append({
+            "op": "buffered" if interval else "per-call",
+            "calls": calls,
+            "calls_per_s": calls / elapsed if elapsed else 0.0,
+            "read_ms": read * 1000,
+        })
+
+    return results
+
+
+def bench_suite(sizes: list[int], duplicate_ratio: float = 0.2, seed: int = 0) -> dict:
+    """Throughput and latency of every Database operation at each corpus size.
+
+    Runs an instrumented Database over make_corpus(rows, seed, duplicate_ratio)
+    and reads per-operation latency from Database.metrics(). The result is
+    JSON-serializable so runs can be saved and compared with --baseline.
+    """
+    rng = random.Random(seed)
+    runs = []
+
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(str(Path(tmp) / "bench.db"), instrument=True)
+            db.init()
+
+            ingest = _timed(lambda: [db.save_items_bulk(batch) for batch in make_corpus(rows, seed, duplicate_ratio)])
+            db.metrics(reset=True)
+
+            # Sensor-sized writes on top of the corpus
+            for batch in make_corpus(2000, seed + 1, duplicate_ratio, batch_size=50):
+                db.save_items(batch, watch_name="bench")
+
+            # Read windows: the newest 1000 items, and one source within them
+            window = db.connection.execute(
+                "SELECT fetched_at FROM items ORDER BY fetched_at DESC LIMIT 1 OFFSET 999"
+            ).fetchone()[0]
+            for i in range(20):
+                db.get_items(since=window)
+                db.get_items(source=SOURCES[i % len(SOURCES)], since=window)
+            scan = _timed(lambda: sum(1 for _ in db.iter_items(columns=["title", "url"], chunk_size=1000)))
+            # Rare terms, common terms and common pairs; see bench_search
+            for i in range(60):
+                queries = (rng.choice(WORDS[100:2000]), rng.choice(WORDS[:13]), " ".join(rng.sample(WORDS[:13], 2)))
+                db.search_items(queries[i % 3], limit=20)
+
+            item_ids = [row[0] for row in db.connection.execute("SELECT id FROM items LIMIT 500")]
+            for i in range(100):
+                db.save_analysis(f"watch-{i % 5}", rng.sample(item_ids, 20), "report.md", 20, f"lens-{i % 3}")
+            for i in range(50):
+                db.get_run_stats(since="2000-01-01" if i % 2 else None)
+
+            for i in range(10000):
+                db.update_source_health(SOURCES[i % len(SOURCES)], rng.random() < 0.95, rng.lognormvariate(-2, 1))
+            for _ in range(50):
+                db.get_source_health()
+            db.flush_source_health()
+
+            metrics = db.metrics()
+            db.close()
+
+        operations = {
+            name: {key: stats[key] for key in ("calls", "p50", "p95", "p99", "max_ms") if key in stats}
+            for name, stats in metrics["methods"].items()
+        }
+        runs.append({
+            "rows": rows,
+            "ingest_rows_per_s": rows / ingest if ingest else 0.0,
+            "scan_rows_per_s": (rows + 2000) / scan if scan else 0.0,
+            "operations": operations,
+            "commits": {key: metrics["commits"].get(key) for key in ("calls", "p50", "p95", "p99")},
+            "slowest_statements": [
+                {"sql": sql[:120], "calls": stats["calls"], "total_ms": stats["total_ms"]}
+                for sql, stats in list(metrics["statements"].items())[:5]
+            ],
+        })
+
+    return {
+        "seed": seed,
+        "duplicate_ratio": duplicate_ratio,
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "at": datetime.now(timezone.utc).isoformat(),
+        "runs": runs,
+    }
+
+
+def compare_suite(
+    current: dict,
+    baseline: dict,
+    tolerance: float = 1.5,
+    min_delta_ms: float = 0.5,
+    min_calls: int = 20
+) -> list[str]:
+    """Operations whose p95 grew by more than tolerance over the baseline.
+
+    Changes under min_delta_ms and operations with fewer than min_calls
+    calls are ignored; at that scale run-to-run noise dominates.
+    """
+    regressions = []
+    previous = {run["rows"]: run for run in baseline["runs"]}
+
+    for run in current["runs"]:
+        before = previous.get(run["rows"])
+        if before is None:
+            continue
+        for name, stats in run["operations"].items():
+            old = before["operations"].get(name, {}).get("p95")
+            new = stats.get("p95", 0)
+            if stats["calls"] < min_calls or not old:
+                continue
+            if new > old * tolerance and new - old >= min_delta_ms:
+                regressions.append(f"{run['rows']} rows {name}: p95 {old:.3f} -> {new:.3f} ms")
+        for key in ("ingest_rows_per_s", "scan_rows_per_s"):
+            if before.get(key) and run[key] * tolerance < before[key]:
+                regressions.append(f"{run['rows']} rows {key}: {before[key]:.0f} -> {run[key]:.0f}")
+
+    return regressions
+
+
+def query_plans(db: Database) -> list[dict]:
+    """EXPLAIN QUERY PLAN for the hot read paths of Database.
+
+    A plan is flagged when it scans a table without an index or sorts with a
+    temporary b-tree; either makes latency grow with the table. Queries over
+    tables bounded by the number of watches and lenses may do both, and
+    GROUP BY over an indexed day range may sort its groups.
+    """
+    since, until = "2026-01-01T00:00:00", "2026-12-31T23:59:59"
+    page = " ORDER BY fetched_at DESC, id DESC LIMIT 500"
+    queries: dict[str, tuple[str, list, bool]] = {}
+
+    for name, filters in {
+        "get_items(since, until)": (None, since, until, None),
+        "get_items(source, since)": ("hacker_news", since, None, None),
+        "get_items(watch_name, since)": (None, since, None, "bench"),
+        "get_items(watch_name)": (None, None, None, "bench"),
+    }.items():
+        where, params = db._item_filters(*filters)
+        select = db._item_select(ITEM_COLUMNS)
+        queries[name] = (f"{select} WHERE {where} ORDER BY fetched_at DESC", params, False)
+
+    where, params = db._item_filters(None, since, None, "bench")
+    queries["iter_items page"] = (
+        f"SELECT id, fetched_at, title FROM items WHERE {where} AND (fetched_at, id) < (?, ?)" + page,
+        [*params, until, 1_000_000],
+        False,
+    )
+    queries["save_items_bulk lookup"] = (
+        "SELECT id, source_id FROM items WHERE source = ? AND source_id IN (?, ?)",
+        ["hacker_news", "a", "b"],
+        False,
+    )
+    queries["analyses for item"] = (
+        "SELECT analysis_id FROM analysis_items WHERE item_id = ?", [1], False,
+    )
+
+    # get_run_stats reads the rollups; capture the SQL rollups.read_stats issues
+    for name, args in {
+        "get_run_stats()": (None, None, None),
+        "get_run_stats(since, until)": (since, until, None),
+        "get_run_stats(since, watch_name)": (since, None, "bench"),
+    }.items():
+        statements: list[str] = []
+        db.connection.set_trace_callback(statements.append)
+        rollups.read_stats(db.connection.cursor(), *args)
+        db.connection.set_trace_callback(None)
+        for i, sql in enumerate(statements):
+            table = sql.split("FROM ", 1)[1].split()[0]
+            bounded = table in ("run_stats_watch", "run_stats_watch_lenses")
+            queries[f"{name} #{i} [{table}]"] = (sql, [], bounded)
+
+    results = []
+    for name, (sql, params, bounded) in queries.items():
+        plan = [row[3] for row in db.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        bad = [
+            step for step in plan
+            if (step.startswith("SCAN ") and " INDEX " not in step and not bounded)
+            or ("TEMP B-TREE" in step and not bounded and "FOR GROUP BY" not in step)
+        ]
+        results.append({"query": name, "plan": plan, "ok": not bad})
+
+    return results
+
+
+def check_query_plans(rows: int = 20000) -> list[dict]:
+    """Build a populated database and return query_plans() for it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "bench.db"))
+        db.init()
+        db.save_items_bulk(make_items(rows, content_size=60), watch_name="bench")
+        for i in range(100):
+            db.save_analysis("bench", [i + 1], f"reports/{i}.md", 1, "deep_insight")
+        results = query_plans(db)
+        db.close()
+
+    return results
+
+
+def _print_table(results: list[dict]):
+    print(f"{'op':<28}{'rows':>10}{'fresh (s)':>12}{'dup (s)':>12}{'rows/s':>12}")
+    for r in results:
+        print(f"{r['op']:<28}{r['rows']:>10}{r['fresh_s']:>12.3f}{r['dup_s']:>12.3f}{r['rows_per_s']:>12.0f}")
+
+
+def _print_search(r: dict):
+    print(f"\nsearch_items over {r['rows']} items (at most {SEARCH_CANDIDATES} candidates ranked):")
+    print(f"  {'query':<28}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for kind, stats in r["latency"].items():
+        print(f"  {kind:<28}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    print(f"  search index cost at ingest: {r['ingest_items']} items in {r['ingest_s']:.2f} s, "
+          f"{r['ingest_unindexed_s']:.2f} s without it ({r['ingest_s'] / r['ingest_unindexed_s']:.1f}x)")
+
+
+def _print_concurrent(results: list[dict]):
+    print(f"{'mode':<14}{'workers':>8}{'rows':>10}{'time (s)':>10}{'rows/s':>10}{'lost':>8}{'errors':>8}")
+    for r in results:
+        print(f"{r['op']:<14}{r['workers']:>8}{r['rows']:>10}{r['elapsed_s']:>10.2f}"
+              f"{r['rows_per_s']:>10.0f}{r['lost']:>8}{r['errors']:>8}")
+
+
+def _print_suite(suite: dict):
+    for run in suite["runs"]:
+        print(f"\n{run['rows']} rows: ingest {run['ingest_rows_per_s']:.0f} rows/s, "
+              f"scan {run['scan_rows_per_s']:.0f} rows/s, commit p95 {run['commits']['p95']} ms")
+        print(f"  {'operation':<22}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, stats in run["operations"].items():
+            print(f"  {name:<22}{stats['calls']:>8}{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+                  f"{stats['p99']:>10.3f}{stats['max_ms']:>10.3f}")
+
+
+def _print_plans(results: list[dict]):
+    for r in results:
+        print(f"{'ok  ' if r['ok'] else 'SLOW'} {r['query']}")
+        for step in r["plan"]:
+            print(f"       {step}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signex storage benchmarks")
+    parser.add_argument("--plans", action="store_true",
+                        help="Only check query plans; exit 1 if any query scans or sorts")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated item counts")
+    parser.add_argument("--search", type=int, default=0,
+                        help="Corpus size for the search_items latency benchmark")
+    parser.add_argument("--async-sensors", type=int, default=0,
+                        help="Sensor count for the asyncio fetch-and-persist benchmark")
+    parser.add_argument("--storage", type=int, default=0,
+                        help="Corpus size for the plain vs compressed storage comparison")
+    parser.add_argument("--health", type=int, default=0,
+                        help="Call count for the source-health recording benchmark")
+    parser.add_argument("--workers", default="",
+                        help="Comma-separated sensor thread counts for the concurrency stress test")
+    parser.add_argument("--suite", default="",
+                        help="Comma-separated corpus sizes for the per-operation suite (e.g. 10000,100000,1000000)")
+    parser.add_argument("--duplicates", type=float, default=0.2,
+                        help="Suite: share of items repeating an earlier item's body")
+    parser.add_argument("--seed", type=int, default=0, help="Suite: corpus seed")
+    parser.add_argument("--json", help="Suite: write results to this file")
+    parser.add_argument("--baseline", help="Suite: exit 1 if any operation regressed against this results file")
+    args = parser.parse_args()
+
+    if args.suite:
+        suite = bench_suite([int(s) for s in args.suite.split(",") if s], args.duplicates, args.seed)
+        _print_suite(suite)
+        if args.json:
+            Path(args.json).write_text(json.dumps(suite, indent=2))
+        if args.baseline:
+            regressions = compare_suite(suite, json.loads(Path(args.baseline).read_text()))
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            sys.exit(1 if regressions else 0)
+        return
+
+    if args.plans:
+        results = check_query_plans()
+        _print_plans(results)
+        sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    _print_table(bench_save_items(sizes))
+
+    if args.search:
+        _print_search(bench_search(args.search))
+
+    if args.async_sensors:
+        print()
+        for r in bench_async(args.async_sensors):
+            print(f"{r['op']:<22}{r['sensors']:>4} sensors {r['rows']:>8} rows {r['elapsed_s']:>8.2f} s")
+
+    if args.storage:
+        print()
+        for r in bench_storage(args.storage):
+            reads = "  ".join(f"{k} {v:.1f} ms" for k, v in list(r.items())[4:])
+            print(f"{r['storage']:<11}{r['rows']:>8} rows {r['file_mb']:>8.1f} MB"
+                  f"  write {r['write_s']:.2f} s  {reads}")
+
+    if args.health:
+        print()
+        for r in bench_health(args.health):
+            print(f"{r['op']:<11}{r['calls']:>8} calls {r['calls_per_s']:>12.0f} calls/s"
+                  f"  get_source_health {r['read_ms']:.2f} ms")
+
+    if args.workers:
+        print()
+        _print_concurrent(bench_concurrent([int(w) for w in args.workers.split(",") if w]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compressed, content-addressed storage for item bodies and metadata.
+
+With Database(compress=True), item content and metadata JSON are written to
+the ``blobs`` table keyed by a BLAKE2b hash of the raw text, and the item row
+keeps only the hash. Identical bodies (the same article fetched by several
+sensors, or re-fetched on every run) are stored once.
+
+Bodies are zlib-compressed; short ones are kept raw because compression
+would not pay for its header. The codec is stored per blob so others can be
+added without rewriting old rows. Reads decompress through the
+``signex_decompress(codec, data)`` SQL function, which every Database
+connection registers, so a blob is only decompressed when a query actually
+selects its column.
+
+Databases that never store blobs keep a schema plain sqlite3 can write to.
+The first compressed write (or compress_items) switches the search index
+to read through the ``items_fulltext`` view; from then on only connections
+that registered signex_decompress can insert or delete items.
+"""
+
+import hashlib
+import sqlite3
+import zlib
+
+MIN_COMPRESS_SIZE = 128
+ZLIB_LEVEL = 6
+
+
+def digest(text: str) -> bytes:
+    """Content address for a body."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def encode(text: str) -> tuple[bytes, str, bytes, int]:
+    """Return (hash, codec, data, size) for a blob row."""
+    raw = text.encode("utf-8")
+    key = hashlib.blake2b(raw, digest_size=16).digest()
+    if len(raw) < MIN_COMPRESS_SIZE:
+        return key, "raw", raw, len(raw)
+    return key, "zlib", zlib.compress(raw, ZLIB_LEVEL), len(raw)
+
+
+def decompress(codec: str | None, data: bytes | None) -> str | None:
+    """Inverse of encode(); None passes through (missing blob)."""
+    if data is None:
+        return None
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if codec == "raw":
+        return bytes(data).decode("utf-8")
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def register(connection: sqlite3.Connection):
+    """Make signex_decompress() available to queries, views and triggers."""
+    connection.create_function("signex_decompress", 2, decompress, deterministic=True)
+
+
+def store(cursor: sqlite3.Cursor, texts: list[str | None]) -> list[bytes | None]:
+    """Write blobs for texts (skipping ones already stored) and return their hashes."""
+    keys: list[bytes | None] = []
+    rows: dict[bytes, tuple] = {}
+
+    for text in texts:
+        if text is None:
+            keys.append(None)
+            continue
+        key = digest(text)
+        keys.append(key)
+        if key not in rows:
+            rows[key] = (text,)
+
+    if rows:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO blobs (hash, codec, data, size) VALUES (?, ?, ?, ?)",
+            [encode(text) for (text,) in rows.values()],
+        )
+    return keys
+
+
+def prune(cursor: sqlite3.Cursor) -> int:
+    """Delete blobs no item refers to. Returns the number deleted."""
+    cursor.execute("""
+        DELETE FROM blobs WHERE hash NOT IN (
+            SELECT content_hash FROM items WHERE content_hash IS NOT NULL
+            UNION
+            SELECT metadata_hash FROM items WHERE metadata_hash IS NOT NULL
+        )
+    """)
+    return cursor.rowcount
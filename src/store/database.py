@@ -1,136 +1,603 @@
 """SQLite database wrapper for Signex."""
 
 import sqlite3
+import itertools
 import json
+import threading
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from src.store import blobs, health, metrics, retention, rollups
+from src.store.dedup import link_duplicates
+from src.store.metrics import timed
+from src.store.migrations import has_table, install_blob_search, migrate
 from src.store.models import SensorItem
+from src.store.writer import WriterThread
+
+# Keep bound parameters per statement well under SQLITE_MAX_VARIABLE_NUMBER.
+_LOOKUP_CHUNK = 400
+# Matches search_items ranks at most; see its docstring
+SEARCH_CANDIDATES = 10000
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+ITEM_COLUMNS = (
+    "id", "source", "source_id", "title", "url", "content", "metadata",
+    "fetched_at", "published_at", "watch_name", "canonical_id",
+)
+
+# Applied to every connection in concurrent mode.
+_CONCURRENT_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+]
+_BUSY_TIMEOUT = 30.0
 
 
 class Database:
     """SQLite database for storing sensor items and analysis records."""
 
-    def __init__(self, db_path: str = "data/signex.db"):
+    def __init__(
+        self,
+        db_path: str = "data/signex.db",
+        concurrent: bool = False,
+        dedup: bool = True,
+        compress: bool = False,
+        health_flush_interval: float = 5.0,
+        instrument: bool = False,
+        slow_query_ms: float = 100.0
+    ):
+        """
+        Args:
+            db_path: Path to the SQLite file
+            concurrent: Enable WAL, route all writes through a single writer
+                thread that group-commits, and give each reader thread its
+                own connection. Use when sensors run in parallel threads.
+            dedup: Link cross-source near-duplicates to a canonical item at
+                ingest (see src.store.dedup).
+            compress: Store new item bodies and metadata compressed and
+                content-addressed in the blobs table (see src.store.blobs).
+                Reads work the same either way.
+            health_flush_interval: Seconds update_source_health buffers
+                calls in memory before writing them in one transaction
+                (see src.store.health). 0 writes every call.
+            instrument: Record method and SQL statement timings, row counts
+                and commit latency, readable through metrics() (see
+                src.store.metrics). Off by default; adds a few microseconds
+                per statement.
+            slow_query_ms: Statements at least this slow go to the slow
+                query log when instrument is on.
+        """
         self.db_path = db_path
+        self.concurrent = concurrent
+        self.dedup = dedup
+        self.compress = compress
         self.connection = None
+        self._writer: WriterThread | None = None
+        self._local = threading.local()
+        self._readers: dict[threading.Thread, sqlite3.Connection] = {}
+        self._readers_lock = threading.Lock()
+        self._health = health.HealthBuffer(health_flush_interval)
+        self._metrics = metrics.Metrics(slow_query_ms) if instrument else None
 
     def init(self):
         """Initialize database schema."""
         db_file = Path(self.db_path)
         db_file.parent.mkdir(parents=True, exist_ok=True)
 
-        self.connection = sqlite3.connect(self.db_path)
-        self.connection.row_factory = sqlite3.Row
-
-        cursor = self.connection.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY,
-                source TEXT NOT NULL,
-                source_id TEXT,
-                title TEXT,
-                url TEXT,
-                content TEXT,
-                metadata JSON,
-                fetched_at TIMESTAMP NOT NULL,
-                published_at TIMESTAMP,
-                watch_name TEXT,
-                UNIQUE(source, source_id)
-            )
-        """)
+        self.connection = self._connect()
 
-        # Migration: add watch_name column for existing databases
-        try:
-            cursor.execute("ALTER TABLE items ADD COLUMN watch_name TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS analyses (
-                id INTEGER PRIMARY KEY,
-                watch_name TEXT NOT NULL,
-                run_at TIMESTAMP NOT NULL,
-                item_count INTEGER NOT NULL DEFAULT 0,
-                lens TEXT,
-                report_path TEXT
-            )
-        """)
+        migrate(self.connection)
+        if self.compress:
+            # Before the writer starts, so this runs on self.connection
+            self._write(lambda connection: install_blob_search(connection.cursor()))
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS analysis_items (
-                analysis_id INTEGER REFERENCES analyses(id),
-                item_id INTEGER REFERENCES items(id),
-                PRIMARY KEY (analysis_id, item_id)
-            )
-        """)
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS source_health (
-                source TEXT PRIMARY KEY,
-                last_success TEXT,
-                last_failure TEXT,
-                consecutive_failures INTEGER DEFAULT 0,
-                total_calls INTEGER DEFAULT 0,
-                total_failures INTEGER DEFAULT 0
-            )
-        """)
+        if self.concurrent:
+            self._local.connection = self.connection
+            self._writer = WriterThread(self._connect)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for the current mode."""
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=_BUSY_TIMEOUT,
+            check_same_thread=not self.concurrent,
+            factory=metrics.InstrumentedConnection if self._metrics else sqlite3.Connection,
+        )
+        if self._metrics:
+            connection.metrics = self._metrics
+        connection.row_factory = sqlite3.Row
+        blobs.register(connection)
+        # Only takes effect on a new file, so it must precede journal_mode;
+        # see retention.incremental_vacuum
+        connection.execute(f"PRAGMA auto_vacuum = {retention.INCREMENTAL}")
+        if self.concurrent:
+            for pragma in _CONCURRENT_PRAGMAS:
+                connection.execute(pragma)
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        """Return the read connection for the calling thread."""
+        if not self.concurrent:
+            return self.connection
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._readers_lock:
+                # Sensors often run on short-lived threads; close the
+                # connections of the ones that have exited so open
+                # connections stay bounded by the live reader threads.
+                for thread in [t for t in self._readers if not t.is_alive()]:
+                    self._readers.pop(thread).close()
+                self._readers[threading.current_thread()] = connection
+        return connection
+
+    def _write(self, job: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a write job in its own transaction and return its result.
+
+        In concurrent mode the job is handed to the writer thread, which may
+        commit it together with jobs from other threads.
+        """
+        if self._writer:
+            return self._writer.submit(job)
 
-        self.connection.commit()
+        try:
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN IMMEDIATE")
+            result = job(self.connection)
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        return result
 
+    @timed
     def save_items(self, items: list[SensorItem], watch_name: str | None = None) -> dict:
         """Save items to database with deduplication.
 
-        Returns {"inserted": count, "item_ids": [list of inserted IDs]}.
+        Returns {"inserted": count, "item_ids": [list of inserted IDs],
+        "clusters": {canonical_id: size}} where clusters lists every
+        near-duplicate cluster a new item joined.
         """
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
-        inserted_count = 0
-        item_ids: list[int] = []
+        def write(connection: sqlite3.Connection) -> dict:
+            cursor = connection.cursor()
+            inserted_count = 0
+            item_ids: list[int] = []
+            new_items: list[tuple] = []
+
+            for item in items:
+                try:
+                    metadata = json.dumps(item.metadata, ensure_ascii=False) if item.metadata else None
+                    content, metadata, content_hash, metadata_hash = self._pack(cursor, item.content, metadata)
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO items
+                        (source, source_id, title, url, content, metadata, fetched_at, published_at, watch_name,
+                         content_hash, metadata_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        item.source,
+                        item.source_id,
+                        item.title,
+                        item.url,
+                        content,
+                        metadata,
+                        datetime.now(timezone.utc).isoformat(),
+                        item.published_at.isoformat() if item.published_at else None,
+                        watch_name or item.watch_name,
+                        content_hash,
+                        metadata_hash,
+                    ))
+
+                    if cursor.rowcount > 0:
+                        inserted_count += 1
+                        item_ids.append(cursor.lastrowid)
+                        new_items.append((cursor.lastrowid, item.url, item.title, item.content))
+                except sqlite3.Error:
+                    continue
+
+            clusters = link_duplicates(cursor, new_items) if self.dedup else {}
+            return {"inserted": inserted_count, "item_ids": item_ids, "clusters": clusters}
+
+        return self._write(write)
+
+    @timed
+    def save_items_bulk(
+        self,
+        batches: Iterable[SensorItem] | Iterable[Iterable[SensorItem]],
+        watch_name: str | None = None
+    ) -> dict:
+        """Save a batch (or an iterable of batches) of items in one transaction.
+
+        Any iterable of SensorItem (list, tuple, generator) is one batch;
+        an iterable of such iterables is several.
+
+        Rows whose (source, source_id) already exist are filtered out with a
+        single set lookup per batch before inserting, so duplicates never
+        reach the INSERT.
+
+        Returns {"inserted": count, "item_ids": [list of inserted IDs],
+        "by_source": {"source": {"inserted": N, "duplicate": N, "failed": N}},
+        "clusters": {canonical_id: size}}.
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        iterator = iter(batches)
+        first = next(iterator, None)
+        if first is None:
+            batches = []
+        elif isinstance(first, SensorItem):
+            batches = [[first, *iterator]]
+        else:
+            batches = itertools.chain([first], iterator)
+
+        def write(connection: sqlite3.Connection) -> dict:
+            cursor = connection.cursor()
+            item_ids: list[int] = []
+            by_source: dict[str, dict[str, int]] = {}
+            clusters: dict[int, int] = {}
+
+            def count(source: str, key: str, n: int = 1):
+                stats = by_source.setdefault(source, {"inserted": 0, "duplicate": 0, "failed": 0})
+                stats[key] += n
+
+            for batch in batches:
+                rows, failed = self._prepare_rows(batch, watch_name)
+                for source in failed:
+                    count(source, "failed")
+
+                existing = self._lookup_keys(
+                    cursor, [(row[0], row[1]) for row in rows if row[1] is not None]
+                )
+                fresh: list[tuple] = []
+                seen: set[tuple[str, str]] = set()
+                for row in rows:
+                    key = (row[0], row[1])
+                    if row[1] is not None and (key in existing or key in seen):
+                        count(row[0], "duplicate")
+                        continue
+                    seen.add(key)
+                    fresh.append(row)
+
+                inserted = self._insert_rows(cursor, fresh, count)
+                item_ids.extend(item_id for item_id, _ in inserted)
+                if self.dedup:
+                    batch_clusters = link_duplicates(
+                        cursor, [(item_id, row[3], row[2], row[4]) for item_id, row in inserted]
+                    )
+                    clusters.update(batch_clusters)
+
+            return {
+                "inserted": len(item_ids),
+                "item_ids": item_ids,
+                "by_source": by_source,
+                "clusters": clusters,
+            }
+
+        return self._write(write)
+
+    @staticmethod
+    def _prepare_rows(
+        items: list[SensorItem],
+        watch_name: str | None
+    ) -> tuple[list[tuple], list[str]]:
+        """Serialize items into insert rows, returning (rows, failed sources)."""
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        rows: list[tuple] = []
+        failed: list[str] = []
 
         for item in items:
             try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO items
-                    (source, source_id, title, url, content, metadata, fetched_at, published_at, watch_name)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                rows.append((
                     item.source,
                     item.source_id,
                     item.title,
                     item.url,
                     item.content,
-                    json.dumps(item.metadata, ensure_ascii=False) if item.metadata else None,
-                    datetime.now(timezone.utc).isoformat(),
+                    _json_encoder.encode(item.metadata) if item.metadata else None,
+                    fetched_at,
                     item.published_at.isoformat() if item.published_at else None,
                     watch_name or item.watch_name,
                 ))
+            except (TypeError, ValueError, AttributeError):
+                failed.append(item.source)
+
+        return rows, failed
+
+    def _pack(
+        self,
+        cursor: sqlite3.Cursor,
+        content: str | None,
+        metadata: str | None
+    ) -> tuple[str | None, str | None, bytes | None, bytes | None]:
+        """Move a body and metadata into blobs when compressing.
+
+        Returns the (content, metadata, content_hash, metadata_hash) column
+        values. Empty bodies stay inline.
+        """
+        if not self.compress:
+            return content, metadata, None, None
+        content_hash, metadata_hash = blobs.store(cursor, [content or None, metadata])
+        return (content if content_hash is None else None), None, content_hash, metadata_hash
 
-                if cursor.rowcount > 0:
-                    inserted_count += 1
-                    item_ids.append(cursor.lastrowid)
+    def _pack_rows(self, cursor: sqlite3.Cursor, rows: list[tuple]) -> list[tuple]:
+        """Turn prepared rows into insert rows, writing blobs in one batch if compressing."""
+        if not self.compress:
+            return [(*row, None, None) for row in rows]
+
+        hashes = blobs.store(cursor, [row[4] or None for row in rows] + [row[5] for row in rows])
+        content_hashes, metadata_hashes = hashes[:len(rows)], hashes[len(rows):]
+        return [
+            (*row[:4], row[4] if content_hash is None else None, None, *row[6:], content_hash, metadata_hash)
+            for row, content_hash, metadata_hash in zip(rows, content_hashes, metadata_hashes)
+        ]
+
+    def _insert_rows(self, cursor: sqlite3.Cursor, rows: list[tuple], count) -> list[tuple[int, tuple]]:
+        """Insert pre-filtered rows, returning (item ID, row) for each new item.
+
+        Falls back to row-by-row inserts if the batch statement fails, so a
+        single bad row is counted as failed instead of sinking the batch.
+        Rows without a source_id bypass dedup and are always inserted singly.
+        """
+        sql = """
+            INSERT OR IGNORE INTO items
+            (source, source_id, title, url, content, metadata, fetched_at, published_at, watch_name,
+             content_hash, metadata_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        pairs = list(zip(rows, self._pack_rows(cursor, rows)))
+        keyed = [pair for pair in pairs if pair[0][1] is not None]
+        single = [pair for pair in pairs if pair[0][1] is None]
+        inserted: list[tuple[int, tuple]] = []
+
+        cursor.execute("SAVEPOINT bulk_batch")
+        try:
+            # AUTOINCREMENT continues after the larger of the two
+            last_id = cursor.execute("""
+                SELECT MAX(COALESCE(MAX(id), 0), COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'items'), 0))
+                FROM items
+            """).fetchone()[0]
+            cursor.executemany(sql, [packed for _, packed in keyed])
+            written = cursor.rowcount
+            cursor.execute("RELEASE bulk_batch")
+            if written == len(keyed):
+                # Writer lock is held and nothing was ignored, so SQLite handed
+                # out consecutive IDs after the previous high-water mark.
+                inserted.extend(zip(range(last_id + 1, last_id + 1 + len(keyed)), (row for row, _ in keyed)))
+                for row, _ in keyed:
+                    count(row[0], "inserted")
+            else:
+                # OR IGNORE also skips constraint violations (e.g. a NULL
+                # source), so only rows that can be found were written.
+                ids = self._lookup_keys(cursor, [(row[0], row[1]) for row, _ in keyed])
+                for row, _ in keyed:
+                    if (row[0], row[1]) in ids:
+                        inserted.append((ids[(row[0], row[1])], row))
+                        count(row[0], "inserted")
+                    else:
+                        count(row[0], "failed")
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO bulk_batch")
+            cursor.execute("RELEASE bulk_batch")
+            single = keyed + single
+
+        for row, packed in single:
+            try:
+                cursor.execute(sql, packed)
             except sqlite3.Error:
+                count(row[0], "failed")
                 continue
+            if cursor.rowcount > 0:
+                count(row[0], "inserted")
+                inserted.append((cursor.lastrowid, row))
+        return inserted
+
+    @staticmethod
+    def _lookup_keys(cursor: sqlite3.Cursor, keys: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        """Map stored (source, source_id) keys to their item IDs.
+
+        Keys are grouped per source so every lookup is a search on the
+        UNIQUE(source, source_id) index rather than a table scan.
+        """
+        by_source: dict[str, list[str]] = {}
+        for source, source_id in keys:
+            by_source.setdefault(source, []).append(source_id)
+
+        found: dict[tuple[str, str], int] = {}
+        for source, source_ids in by_source.items():
+            source_ids = list(dict.fromkeys(source_ids))
+            for start in range(0, len(source_ids), _LOOKUP_CHUNK):
+                chunk = source_ids[start:start + _LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT id, source_id FROM items WHERE source = ? AND source_id IN ({placeholders})",
+                    [source, *chunk],
+                )
+                found.update(((source, row[1]), row[0]) for row in cursor.fetchall())
+
+        return found
+
+    def backfill_fingerprints(self, batch_size: int = 1000) -> int:
+        """Fingerprint items stored before near-duplicate detection existed.
+
+        Items are processed oldest first so earlier items become canonical.
+        Returns the number of items fingerprinted.
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        # Keyset pagination: each batch starts after the last ID seen, so
+        # the whole backfill reads the table once.
+        last_id = 0
+
+        def write(connection: sqlite3.Connection) -> int:
+            nonlocal last_id
+            cursor = connection.cursor()
+            rows = cursor.execute(f"""
+                {self._item_select(["id", "url", "title", "content"])}
+                WHERE items.id > ?
+                  AND NOT EXISTS (SELECT 1 FROM item_fingerprints f WHERE f.item_id = items.id)
+                ORDER BY items.id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            link_duplicates(cursor, [tuple(row) for row in rows])
+            if rows:
+                last_id = rows[-1]["id"]
+            return len(rows)
+
+        total = 0
+        while True:
+            done = self._write(write)
+            total += done
+            if done < batch_size:
+                return total
+
+    def compress_items(self, batch_size: int = 1000) -> int:
+        """Move inline bodies and metadata of existing items into blobs.
+
+        Converts a database written without compress=True. Returns the
+        number of items converted. Run VACUUM afterwards to shrink the file.
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        self._write(lambda connection: install_blob_search(connection.cursor()))
+        last_id = 0
+
+        def write(connection: sqlite3.Connection) -> int:
+            nonlocal last_id
+            cursor = connection.cursor()
+            rows = cursor.execute("""
+                SELECT id, content, metadata FROM items
+                WHERE id > ? AND ((content IS NOT NULL AND content != '') OR metadata IS NOT NULL)
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if rows:
+                last_id = rows[-1]["id"]
+
+            hashes = blobs.store(
+                cursor, [row["content"] or None for row in rows] + [row["metadata"] for row in rows]
+            )
+            cursor.executemany("""
+                UPDATE items SET content = ?, metadata = NULL, content_hash = ?, metadata_hash = ?
+                WHERE id = ?
+            """, [
+                (row["content"] if content_hash is None else None, content_hash, metadata_hash, row["id"])
+                for row, content_hash, metadata_hash in zip(rows, hashes[:len(rows)], hashes[len(rows):])
+            ])
+            return len(rows)
+
+        total = 0
+        while True:
+            done = self._write(write)
+            total += done
+            if done < batch_size:
+                return total
+
+    def prune_blobs(self) -> int:
+        """Delete blobs no longer referenced by any item. Returns the number deleted."""
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        return self._write(lambda connection: blobs.prune(connection.cursor()))
+
+    @timed
+    def archive_items(
+        self,
+        policy: dict[str, int] | None = None,
+        default_days: int | None = None,
+        now: datetime | None = None,
+        batch_size: int = 5000
+    ) -> dict[str, int]:
+        """Move items past their retention period into monthly archive files.
+
+        Archived items keep their IDs and stay readable through get_items
+        with a since that reaches their month. Freed pages are returned to
+        the filesystem with an incremental vacuum.
+
+        Args:
+            policy: {watch_name: days to keep} for watches with their own
+                retention period
+            default_days: Days to keep items of every other watch (and
+                items without one); None keeps them forever
+            now: Reference time for the retention periods (default: now)
+            batch_size: Items moved per transaction
+
+        Returns:
+            {month (YYYY-MM): items archived}
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        where, params = retention.expired_filter(policy or {}, default_days, now)
+        reader = self._reader()
+        by_month: dict[str, list[int]] = {}
+        for item_id, month in reader.execute(
+            f"SELECT id, substr(fetched_at, 1, 7) FROM items WHERE {where} ORDER BY id", params
+        ).fetchall():
+            by_month.setdefault(month, []).append(item_id)
+
+        def drop(month: str, path: Path, ids: list[int]) -> Callable[[sqlite3.Connection], int]:
+            def write(connection: sqlite3.Connection) -> int:
+                cursor = connection.cursor()
+                cursor.executemany("DELETE FROM item_fingerprints WHERE item_id = ?", [(i,) for i in ids])
+                cursor.executemany("DELETE FROM items WHERE id = ?", [(i,) for i in ids])
+                count = cursor.rowcount
+                retention.record_archive(cursor, month, path, count)
+                return count
+            return write
+
+        moved: dict[str, int] = {}
+        for month, ids in sorted(by_month.items()):
+            path = retention.archive_path(self.db_path, month)
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                rows: list[sqlite3.Row] = []
+                for offset in range(0, len(batch), _LOOKUP_CHUNK):
+                    chunk = batch[offset:offset + _LOOKUP_CHUNK]
+                    rows += reader.execute(
+                        f"{self._item_select(ITEM_COLUMNS)} WHERE items.id IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                # Archive first: a crash after this leaves a copy, never a loss
+                retention.write_archive(path, rows)
+                moved[month] = moved.get(month, 0) + self._write(drop(month, path, batch))
 
-        self.connection.commit()
-        return {"inserted": inserted_count, "item_ids": item_ids}
+        if moved:
+            self._write(lambda connection: blobs.prune(connection.cursor()))
+            # Outside the writer's transaction: each chunk commits on its own
+            retention.incremental_vacuum(reader)
+        return moved
 
+    @timed
     def get_items(
         self,
         source: str | None = None,
         since: str | None = None,
-        until: str | None = None
+        until: str | None = None,
+        watch_name: str | None = None,
+        canonical_only: bool = False
     ) -> list[dict[str, Any]]:
         """Query items with optional filters.
 
+        Items moved out by archive_items are included when since reaches
+        into an archived month (see src.store.retention).
+
         Args:
             source: Filter by source name
             since: Filter items fetched after this ISO timestamp
             until: Filter items fetched before this ISO timestamp
+            watch_name: Filter by watch name
+            canonical_only: Skip items linked to an earlier near-duplicate
 
         Returns:
             List of item dicts with id included.
@@ -138,28 +605,254 @@ class Database:
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        query = "SELECT * FROM items WHERE 1=1"
+        where, params = self._item_filters(source, since, until, watch_name, canonical_only)
+        query = f"{self._item_select(ITEM_COLUMNS)} WHERE {where}"
+        order = " ORDER BY fetched_at DESC"
+
+        connection = self._reader()
+        cursor = connection.cursor()
+        archived = retention.months_between(cursor, self.db_path, since, until) if since else []
+        if not archived:
+            cursor.execute(query + order, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+        # Hot rows and archives in one UNION ALL, in as few passes as the
+        # attached-database limit allows.
+        rows: list[sqlite3.Row] = []
+        limit = connection.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        for start in range(0, len(archived), limit):
+            paths = [path for _, path in archived[start:start + limit]]
+            with retention.attached(connection, paths) as aliases:
+                parts = [query] if start == 0 else []
+                parts += [f"SELECT {', '.join(ITEM_COLUMNS)} FROM {alias}.items WHERE {where}" for alias in aliases]
+                cursor.execute(" UNION ALL ".join(parts) + order, params * len(parts))
+                rows += cursor.fetchall()
+        if len(archived) > limit:
+            rows.sort(key=lambda row: row["fetched_at"], reverse=True)
+
+        # An interrupted archive run can leave an item in both places
+        seen: set[int] = set()
+        items = []
+        for row in rows:
+            if row["id"] not in seen:
+                seen.add(row["id"])
+                items.append(dict(row))
+        return items
+
+    def iter_items(
+        self,
+        source: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        watch_name: str | None = None,
+        canonical_only: bool = False,
+        columns: list[str] | None = None,
+        chunk_size: int = 500
+    ) -> Iterator[dict[str, Any]]:
+        """Stream items newest first, one page at a time.
+
+        Pages are fetched with keyset pagination on (fetched_at, id), so each
+        page costs the same no matter how deep into the window it is, and
+        only one page is held in memory at a time.
+
+        Args:
+            source: Filter by source name
+            since: Filter items fetched after this ISO timestamp
+            until: Filter items fetched before this ISO timestamp
+            watch_name: Filter by watch name
+            canonical_only: Skip items linked to an earlier near-duplicate
+            columns: Columns to return (default: all). id and fetched_at
+                are always included. Leave out "content" to skip reading
+                (and, for compressed items, decompressing) bodies.
+            chunk_size: Rows fetched per page
+
+        Yields:
+            Item dicts with the requested columns.
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        if columns is None:
+            selected = list(ITEM_COLUMNS)
+        else:
+            unknown = set(columns) - set(ITEM_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown item columns: {', '.join(sorted(unknown))}")
+            selected = list(dict.fromkeys(["id", "fetched_at", *columns]))
+
+        where, params = self._item_filters(source, since, until, watch_name, canonical_only)
+        query = f"{self._item_select(selected)} WHERE {where}"
+        order = " ORDER BY fetched_at DESC, id DESC LIMIT ?"
+        last: tuple[str, int] | None = None
+
+        while True:
+            cursor = self._reader().cursor()
+            if last is None:
+                cursor.execute(query + order, [*params, chunk_size])
+            else:
+                cursor.execute(query + " AND (fetched_at, id) < (?, ?)" + order, [*params, *last, chunk_size])
+            rows = cursor.fetchall()
+            cursor.close()
+
+            for row in rows:
+                yield dict(row)
+
+            if len(rows) < chunk_size:
+                return
+            last = (rows[-1]["fetched_at"], rows[-1]["id"])
+
+    @staticmethod
+    def _item_select(columns: Iterable[str]) -> str:
+        """SELECT ... FROM for item columns, resolving bodies stored as blobs.
+
+        Blobs are only joined for the columns asked for, so projections that
+        skip content never touch (or decompress) them.
+        """
+        exprs: list[str] = []
+        joins: list[str] = []
+
+        for column in columns:
+            if column in ("content", "metadata"):
+                alias = f"{column[0]}b"
+                exprs.append(f"COALESCE(items.{column}, signex_decompress({alias}.codec, {alias}.data)) AS {column}")
+                joins.append(f"LEFT JOIN blobs {alias} ON {alias}.hash = items.{column}_hash")
+            else:
+                exprs.append(f"items.{column}")
+
+        return f"SELECT {', '.join(exprs)} FROM items {' '.join(joins)}".rstrip()
+
+    @staticmethod
+    def _item_filters(
+        source: str | None,
+        since: str | None,
+        until: str | None,
+        watch_name: str | None,
+        canonical_only: bool = False
+    ) -> tuple[str, list[Any]]:
+        """Build the WHERE clause shared by item queries."""
+        where = "1=1"
         params: list[Any] = []
 
         if source:
-            query += " AND source = ?"
+            where += " AND source = ?"
             params.append(source)
 
         if since:
-            query += " AND fetched_at >= ?"
+            where += " AND fetched_at >= ?"
             params.append(since)
 
         if until:
-            query += " AND fetched_at <= ?"
+            where += " AND fetched_at <= ?"
             params.append(until)
 
-        query += " ORDER BY fetched_at DESC"
+        if watch_name:
+            where += " AND watch_name = ?"
+            params.append(watch_name)
+
+        if canonical_only:
+            where += " AND canonical_id IS NULL"
+
+        return where, params
+
+    @timed
+    def search_items(
+        self,
+        query: str,
+        watch_name: str | None = None,
+        since: str | None = None,
+        limit: int = 20,
+        max_candidates: int | None = SEARCH_CANDIDATES
+    ) -> list[dict[str, Any]]:
+        """Full-text search over item titles and content, best match first.
+
+        BM25 has to score every match before the best ones are known, so a
+        common term would cost time proportional to the corpus. Queries
+        matching more than max_candidates items rank only the newest
+        max_candidates of them.
+
+        Args:
+            query: FTS5 query (e.g. 'claude AND "code review"'). Plain text
+                that isn't valid FTS5 syntax is searched as separate terms.
+            watch_name: Filter by watch name
+            since: Filter items fetched after this ISO timestamp
+            limit: Maximum number of results
+            max_candidates: Matches to rank at most; None ranks them all
+
+        Returns:
+            List of item dicts (without content) plus "rank" (BM25, lower is
+            better) and "snippet" with matches wrapped in [ ].
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+        if not has_table(self._reader(), "items_fts"):
+            raise RuntimeError("Full-text search unavailable: SQLite was built without FTS5.")
+
+        where = "items_fts MATCH ?"
+        params: list[Any] = []
+
+        if watch_name:
+            where += " AND i.watch_name = ?"
+            params.append(watch_name)
+
+        if since:
+            where += " AND i.fetched_at >= ?"
+            params.append(since)
+
+        sql = f"""
+            SELECT i.id, i.source, i.source_id, i.title, i.url, i.fetched_at,
+                   i.published_at, i.watch_name,
+                   bm25(items_fts, 5.0, 1.0) AS rank,
+                   snippet(items_fts, -1, '[', ']', '…', 12) AS snippet
+            FROM items_fts
+            JOIN items i ON i.id = items_fts.rowid
+            WHERE {where} AND items_fts.rowid >= ?
+            ORDER BY rank LIMIT ?
+        """
+        cursor = self._reader().cursor()
+
+        def run(match: str) -> list[dict[str, Any]]:
+            cutoff = self._search_cutoff(cursor, where, [match, *params], max_candidates) if max_candidates else 0
+            cursor.execute(sql, [match, *params, cutoff, limit])
+            return [dict(row) for row in cursor.fetchall()]
+
+        try:
+            return run(query)
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax: match each term literally
+            terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+            if not terms:
+                return []
+            return run(terms)
+
+    @staticmethod
+    def _search_cutoff(cursor: sqlite3.Cursor, where: str, params: list[Any], max_candidates: int) -> int:
+        """Lowest item ID among the newest max_candidates matches (0 if fewer match).
+
+        Walking the match list newest first is cheap; FTS5 only pays for
+        ranking once the rowid bound is applied.
+        """
+        join = " JOIN items i ON i.id = items_fts.rowid" if len(params) > 1 else ""
+        row = cursor.execute(
+            f"SELECT items_fts.rowid FROM items_fts{join} WHERE {where}"
+            " ORDER BY items_fts.rowid DESC LIMIT 1 OFFSET ?",
+            [*params, max_candidates - 1],
+        ).fetchone()
+        return row[0] if row else 0
+
+    def rebuild_search_index(self) -> None:
+        """Rebuild the full-text index from the items table and optimize it."""
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
-        cursor.execute(query, params)
+        def write(connection: sqlite3.Connection) -> None:
+            if not has_table(connection, "items_fts"):
+                raise RuntimeError("Full-text search unavailable: SQLite was built without FTS5.")
+            connection.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+            connection.execute("INSERT INTO items_fts(items_fts) VALUES ('optimize')")
 
-        return [dict(row) for row in cursor.fetchall()]
+        self._write(write)
 
+    @timed
     def save_analysis(
         self,
         watch_name: str,
@@ -175,33 +868,51 @@ class Database:
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
+        def write(connection: sqlite3.Connection) -> int:
+            cursor = connection.cursor()
+            run_at = datetime.now(timezone.utc).isoformat()
 
-        cursor.execute("""
-            INSERT INTO analyses (watch_name, run_at, item_count, lens, report_path)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            watch_name,
-            datetime.now(timezone.utc).isoformat(),
-            item_count,
-            lens,
-            report_path
-        ))
+            cursor.execute("""
+                INSERT INTO analyses (watch_name, run_at, item_count, lens, report_path)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                watch_name,
+                run_at,
+                item_count,
+                lens,
+                report_path
+            ))
 
-        analysis_id = cursor.lastrowid
+            analysis_id = cursor.lastrowid
+            rollups.record_run(cursor, watch_name, run_at, item_count, lens)
 
-        for item_id in item_ids:
-            cursor.execute("""
-                INSERT OR IGNORE INTO analysis_items (analysis_id, item_id)
-                VALUES (?, ?)
-            """, (analysis_id, item_id))
+            for item_id in item_ids:
+                cursor.execute("""
+                    INSERT OR IGNORE INTO analysis_items (analysis_id, item_id)
+                    VALUES (?, ?)
+                """, (analysis_id, item_id))
 
-        self.connection.commit()
-        return analysis_id
+            return analysis_id
 
-    def get_run_stats(self) -> dict[str, Any]:
+        return self._write(write)
+
+    @timed
+    def get_run_stats(
+        self,
+        since: str | None = None,
+        until: str | None = None,
+        watch_name: str | None = None
+    ) -> dict[str, Any]:
         """Get run history statistics.
 
+        Reads the rollups maintained by save_analysis, so the cost does not
+        grow with the number of recorded runs.
+
+        Args:
+            since: Only count runs on or after this date (YYYY-MM-DD or ISO timestamp)
+            until: Only count runs on or before this date
+            watch_name: Only count runs of this watch
+
         Returns:
             {
                 "by_watch": {"watch-name": {"runs": N, "total_items": N, "last_run": "...", "lenses": [...]}},
@@ -212,91 +923,105 @@ class Database:
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT watch_name, run_at, item_count, lens FROM analyses ORDER BY run_at DESC")
-
-        by_watch: dict[str, Any] = {}
-        by_date: dict[str, Any] = {}
-        total_runs = 0
-        total_items = 0
-
-        for row in cursor.fetchall():
-            watch_name = row["watch_name"]
-            run_at = row["run_at"]
-            item_count = row["item_count"] or 0
-            lens = row["lens"] or ""
-
-            # By watch
-            if watch_name not in by_watch:
-                by_watch[watch_name] = {
-                    "runs": 0,
-                    "total_items": 0,
-                    "last_run": run_at,
-                    "lenses": []
-                }
-            by_watch[watch_name]["runs"] += 1
-            by_watch[watch_name]["total_items"] += item_count
-            if lens and lens not in by_watch[watch_name]["lenses"]:
-                by_watch[watch_name]["lenses"].append(lens)
-
-            # By date
-            date_str = run_at.split("T")[0] if "T" in run_at else run_at.split(" ")[0]
-            if date_str not in by_date:
-                by_date[date_str] = {"runs": 0, "total_items": 0}
-            by_date[date_str]["runs"] += 1
-            by_date[date_str]["total_items"] += item_count
-
-            total_runs += 1
-            total_items += item_count
-
-        return {
-            "by_watch": by_watch,
-            "by_date": by_date,
-            "totals": {"runs": total_runs, "total_items": total_items}
-        }
-
-    def update_source_health(self, source: str, success: bool) -> None:
-        """Update health tracking for a sensor source."""
+        return rollups.read_stats(self._reader().cursor(), since, until, watch_name)
+
+    def rebuild_run_stats(self) -> None:
+        """Recompute the run statistics rollups from the analyses table."""
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        self._write(lambda connection: rollups.rebuild(connection.cursor()))
+
+    @timed
+    def update_source_health(self, source: str, success: bool, latency: float | None = None) -> None:
+        """Record one sensor call for health tracking.
+
+        Calls are buffered and written every health_flush_interval seconds
+        (and on close); get_source_health includes them either way.
+
+        Args:
+            source: Sensor source name
+            success: Whether the call succeeded
+            latency: Call duration in seconds, for the latency percentiles
+        """
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
         now = datetime.now(timezone.utc).isoformat()
+        if self._health.record(source, success, now, latency):
+            self.flush_source_health()
 
-        cursor.execute("""
-            INSERT INTO source_health (source, last_success, last_failure, consecutive_failures, total_calls, total_failures)
-            VALUES (?, ?, ?, ?, 1, ?)
-            ON CONFLICT(source) DO UPDATE SET
-                last_success = CASE WHEN ? THEN ? ELSE last_success END,
-                last_failure = CASE WHEN ? THEN ? ELSE last_failure END,
-                consecutive_failures = CASE WHEN ? THEN 0 ELSE consecutive_failures + 1 END,
-                total_calls = total_calls + 1,
-                total_failures = CASE WHEN ? THEN total_failures ELSE total_failures + 1 END
-        """, (
-            source,
-            now if success else None,
-            None if success else now,
-            0 if success else 1,
-            0 if success else 1,
-            success, now,
-            not success, now,
-            success,
-            success,
-        ))
-
-        self.connection.commit()
+    @timed
+    def flush_source_health(self) -> None:
+        """Write buffered source-health updates now."""
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call init() first.")
+
+        pending = self._health.take()
+        if not pending:
+            return
+        window_open = False
+
+        def write(connection: sqlite3.Connection) -> None:
+            nonlocal window_open
+            health.flush(connection.cursor(), pending)
+            self._health.open_commit()
+            window_open = True
+
+        try:
+            self._write(write)
+        except BaseException:
+            self._health.restore(pending, window_open)
+            raise
+        self._health.committed(pending, window_open)
 
+    @timed
     def get_source_health(self) -> list[dict[str, Any]]:
-        """Get health status for all tracked sources."""
+        """Get health status for all tracked sources.
+
+        Each entry has the source_health counters plus "latency_ms":
+        {"count", "p50", "p95", "p99"} (None if no latencies were recorded).
+        """
         if not self.connection:
             raise RuntimeError("Database not initialized. Call init() first.")
 
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT * FROM source_health ORDER BY source")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._health.reading():
+            return health.read_health(self._reader().cursor(), self._health.snapshot())
+
+    def metrics(self, reset: bool = False) -> dict[str, Any]:
+        """Snapshot of the instrumentation recorded so far.
+
+        Args:
+            reset: Clear the recorded metrics after taking the snapshot
+
+        Returns:
+            {
+                "methods": {"get_items": {"calls", "errors", "rows", "total_ms", "max_ms", "p50", "p95", "p99"}},
+                    where rows counts items returned, inserted or archived,
+                "statements": {normalized SQL: same fields, rows returned or changed}, slowest total first,
+                "commits": same fields for commit latency,
+                "slow_queries": [{"sql", "elapsed_ms", "rows", "error", "at", "thread"}], oldest first
+            }
+        """
+        if self._metrics is None:
+            raise RuntimeError("Instrumentation is off. Create the Database with instrument=True.")
+
+        return self._metrics.snapshot(reset)
 
     def close(self):
         """Close database connection."""
         if self.connection:
+            self.flush_source_health()
+        if self._writer:
+            self._writer.stop()
+            self._writer = None
+        with self._readers_lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+        self._local = threading.local()
+        if self.connection:
+            # Refresh planner statistics for the indexes the queries rely on
+            self.connection.execute("PRAGMA optimize")
             self.connection.close()
             self.connection = None
@@ -0,0 +1,237 @@
+"""Cross-source near-duplicate detection for sensor items.
+
+The same story often arrives from several sensors (Hacker News, Reddit, RSS,
+search APIs) under different source IDs. At ingest each new item gets a
+canonical URL key and a 64-bit SimHash of its title and content, stored in
+``item_fingerprints``. An item whose URL key matches, or whose SimHash is
+within ``MAX_DISTANCE`` bits of an earlier item, is linked to that item's
+cluster through ``items.canonical_id``.
+
+SimHashes are split into four 16-bit bands, each indexed. Two hashes within
+3 bits of each other must agree exactly on at least one band, so candidates
+are found with four index lookups instead of a scan.
+"""
+
+import functools
+import hashlib
+import re
+import sqlite3
+from collections.abc import Iterator
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+MAX_DISTANCE = 3
+MIN_FEATURES = 8
+MAX_TEXT = 4000
+
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+# Values per IN (...) lookup
+_CHUNK = 400
+
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid",
+    "igshid", "mc_cid", "mc_eid", "_ga", "_hsenc", "_hsmi", "mkt_tok",
+    "ref", "ref_src", "ref_url", "referrer", "spm", "si",
+}
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def canonicalize_url(url: str | None) -> str | None:
+    """Reduce a URL to a key shared by all links to the same page.
+
+    Drops the scheme, fragment, default ports, common host prefixes
+    (www., m., amp.) and tracking parameters, and sorts what's left of the
+    query. Returns None for empty or relative URLs.
+    """
+    if not url:
+        return None
+
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return None
+    if not host:
+        return None
+
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+
+    return host + path + (f"?{urlencode(query)}" if query else "")
+
+
+# SimHash keeps one 16-bit counter per hash bit, packed into one integer so
+# summing features adds all 64 counters at once.
+_COUNTER_ONES = sum(1 << (16 * i) for i in range(64))
+_COUNTER_SIGNS = 0x8000 * _COUNTER_ONES
+_SIGN_BITS = bytes.maketrans(b"\x00\x80", b"01")
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _feature_counters(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    bits = format(int.from_bytes(digest, "big"), "064b")
+    return int(bits.replace("0", "0000").replace("1", "0001"), 16)
+
+
+def simhash(text: str) -> int | None:
+    """64-bit SimHash over the distinct words of text.
+
+    Only the first MAX_TEXT characters are hashed, which bounds the cost for
+    scraped full-text pages. Returns None when there are too few words for
+    the hash to be meaningful.
+    """
+    features = set(_TOKEN.findall(text[:MAX_TEXT].lower()))
+    if len(features) < MIN_FEATURES:
+        return None
+
+    # Bit i is set when more than half the features set it. Biasing every
+    # counter by 0x8000 - (len // 2 + 1) moves exactly those counters'
+    # top bit to 1 (MAX_TEXT keeps the counts far below 0x8000).
+    counters = sum(map(_feature_counters, features))
+    signs = (counters + (0x8000 - len(features) // 2 - 1) * _COUNTER_ONES) & _COUNTER_SIGNS
+    return int(signs.to_bytes(128, "big")[::2].translate(_SIGN_BITS), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def _signed(value: int) -> int:
+    # SQLite INTEGER is signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(value: int) -> list[int]:
+    return [(value >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+
+
+def _chunks(values: list, size: int = _CHUNK) -> Iterator[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _stored_matches(
+    cursor: sqlite3.Cursor,
+    column: str,
+    values: set
+) -> dict[Any, list[tuple[int, int | None, int]]]:
+    """Fingerprinted items by a url_key or band value, as (item_id, simhash, canonical)."""
+    found: dict[Any, list[tuple[int, int | None, int]]] = {}
+    for chunk in _chunks(sorted(values)):
+        for value, item_id, other, canonical in cursor.execute(
+            f"""
+            SELECT f.{column}, f.item_id, f.simhash, COALESCE(i.canonical_id, f.item_id)
+            FROM item_fingerprints f LEFT JOIN items i ON i.id = f.item_id
+            WHERE f.{column} IN ({', '.join('?' * len(chunk))})
+            """,
+            chunk,
+        ):
+            found.setdefault(value, []).append((item_id, other, canonical))
+    return found
+
+
+def _find_canonical(
+    url_key: str | None,
+    value: int | None,
+    by_url: dict[Any, list[tuple[int, int | None, int]]],
+    by_band: list[dict[Any, list[tuple[int, int | None, int]]]]
+) -> int | None:
+    """Return the canonical ID of the earliest URL match or the closest SimHash match."""
+    if url_key in by_url:
+        return min(by_url[url_key])[2]
+    if value is None:
+        return None
+
+    best: tuple[int, int, int] | None = None
+    for i, band in enumerate(_bands(value)):
+        for item_id, other, canonical in by_band[i].get(band, ()):
+            distance = hamming(value, other & ((1 << 64) - 1))
+            if distance <= MAX_DISTANCE and (best is None or (distance, item_id) < best[:2]):
+                best = (distance, item_id, canonical)
+    return best[2] if best else None
+
+
+def link_duplicates(
+    cursor: sqlite3.Cursor,
+    items: list[tuple[int, str | None, str | None, str | None]]
+) -> dict[int, int]:
+    """Fingerprint newly inserted items and link near-duplicates.
+
+    Earlier items are looked up with one IN query per url_key and band
+    chunk, and items of the same call are matched in memory, so the cost
+    per batch is a handful of statements rather than five per item.
+
+    Args:
+        cursor: Cursor inside the ingest transaction
+        items: (item_id, url, title, content) for each new item, in
+            insertion order
+
+    Returns:
+        {canonical_id: cluster size} for every cluster a new item joined.
+    """
+    prints = [
+        (item_id, canonicalize_url(url), simhash(f"{title or ''} {content or ''}"))
+        for item_id, url, title, content in items
+    ]
+    by_url = _stored_matches(cursor, "url_key", {url_key for _, url_key, _ in prints if url_key})
+    by_band = [
+        _stored_matches(cursor, f"band{i}", {_bands(value)[i] for _, _, value in prints if value is not None})
+        for i in range(_BANDS)
+    ]
+
+    links: list[tuple[int, int]] = []
+    fingerprints: list[tuple] = []
+    for item_id, url_key, value in prints:
+        canonical = _find_canonical(url_key, value, by_url, by_band)
+        if canonical is not None:
+            links.append((canonical, item_id))
+        else:
+            canonical = item_id
+
+        # Later items of this call can match this one
+        entry = (item_id, _signed(value) if value is not None else None, canonical)
+        if url_key:
+            by_url.setdefault(url_key, []).append(entry)
+        if value is not None:
+            for i, band in enumerate(_bands(value)):
+                by_band[i].setdefault(band, []).append(entry)
+        fingerprints.append((item_id, url_key, entry[1], *(_bands(value) if value is not None else [None] * _BANDS)))
+
+    cursor.executemany("UPDATE items SET canonical_id = ? WHERE id = ?", links)
+    cursor.executemany(
+        """
+        INSERT OR REPLACE INTO item_fingerprints (item_id, url_key, simhash, band0, band1, band2, band3)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        fingerprints,
+    )
+
+    clusters: dict[int, int] = {}
+    for chunk in _chunks(sorted({canonical for canonical, _ in links})):
+        for canonical, size in cursor.execute(
+            f"""
+            SELECT canonical_id, COUNT(*) FROM items
+            WHERE canonical_id IN ({', '.join('?' * len(chunk))})
+            GROUP BY canonical_id
+            """,
+            chunk,
+        ):
+            clusters[canonical] = size + 1
+    return dict(sorted(clusters.items()))
@@ -0,0 +1,272 @@
+"""Buffered source-health tracking for Signex sensors.
+
+Database.update_source_health records each sensor call in a HealthBuffer
+instead of writing it. Pending counts are flushed to ``source_health`` in
+one transaction when the flush interval has passed (and on close), so heavy
+polling costs one commit per interval rather than one per HTTP request.
+get_source_health merges flushed, in-flight and pending state, so readers in
+the same process never see stale numbers, even while a flush commits.
+
+Call latencies go into log-scaled histograms (``source_latency``), one row
+per source per bucket. Buckets grow by a factor of 2**(1/4) and report
+their geometric midpoint, so percentiles are within about 10% of the true
+value.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+_BUCKET_BASE = 2 ** 0.25
+PERCENTILES = (50, 95, 99)
+
+
+def latency_bucket(seconds: float, resolution: float = 0.001) -> int:
+    """Histogram bucket for a latency.
+
+    Bucket b covers up to _BUCKET_BASE**b units of resolution seconds
+    (milliseconds by default); everything below one unit is bucket 0.
+    """
+    units = seconds / resolution
+    if units <= 1:
+        return 0
+    return math.ceil(math.log(units, _BUCKET_BASE))
+
+
+def percentiles(buckets: dict[int, int], resolution: float = 0.001) -> dict[str, Any] | None:
+    """{"count", "p50", "p95", "p99"} in milliseconds from a histogram."""
+    total = sum(buckets.values())
+    if not total:
+        return None
+
+    result: dict[str, Any] = {"count": total}
+    ordered = sorted(buckets.items())
+    for p in PERCENTILES:
+        rank = math.ceil(total * p / 100)
+        seen = 0
+        for bucket, count in ordered:
+            seen += count
+            if seen >= rank:
+                result[f"p{p}"] = round(_BUCKET_BASE ** (bucket - 0.5) * resolution * 1000, 3)
+                break
+    return result
+
+
+@dataclass
+class SourceStats:
+    """Health counters for one source, either flushed or pending.
+
+    consecutive_failures is absolute when reset is True (the span contains
+    a success, or the stats come from the table) and otherwise adds to the
+    preceding state.
+    """
+
+    total_calls: int = 0
+    total_failures: int = 0
+    consecutive_failures: int = 0
+    reset: bool = False
+    last_success: str | None = None
+    last_failure: str | None = None
+    buckets: dict[int, int] = field(default_factory=dict)
+
+    def record(self, success: bool, now: str, latency: float | None):
+        self.total_calls += 1
+        if success:
+            self.last_success = now
+            self.consecutive_failures = 0
+            self.reset = True
+        else:
+            self.last_failure = now
+            self.total_failures += 1
+            self.consecutive_failures += 1
+        if latency is not None:
+            bucket = latency_bucket(latency)
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def then(self, newer: "SourceStats") -> "SourceStats":
+        """Combine with stats recorded after these."""
+        buckets = dict(self.buckets)
+        for bucket, count in newer.buckets.items():
+            buckets[bucket] = buckets.get(bucket, 0) + count
+
+        return replace(
+            self,
+            total_calls=self.total_calls + newer.total_calls,
+            total_failures=self.total_failures + newer.total_failures,
+            consecutive_failures=(
+                newer.consecutive_failures if newer.reset
+                else self.consecutive_failures + newer.consecutive_failures
+            ),
+            reset=self.reset or newer.reset,
+            last_success=newer.last_success or self.last_success,
+            last_failure=newer.last_failure or self.last_failure,
+            buckets=buckets,
+        )
+
+
+class HealthBuffer:
+    """Thread-safe pending source-health state.
+
+    Stats taken for a flush stay in an in-flight slot, still part of
+    snapshot(), until their transaction has committed (committed()) or
+    failed (restore()). A flush holds the commit window from the end of
+    its write until then, and reading() waits for open windows to close,
+    so a reader never sees a flush both in the table and in flight.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: dict[str, SourceStats] = {}
+        self._in_flight: list[dict[str, SourceStats]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # Open commit windows and active readers; see reading()
+        self._window = threading.Condition()
+        self._committing = 0
+        self._readers = 0
+
+    def record(self, source: str, success: bool, now: str, latency: float | None) -> bool:
+        """Add one call; returns True when a flush is due."""
+        with self._lock:
+            self._pending.setdefault(source, SourceStats()).record(success, now, latency)
+            return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def take(self) -> dict[str, SourceStats]:
+        """Move everything pending in flight and return it."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if pending:
+                self._in_flight.append(pending)
+            self._last_flush = time.monotonic()
+            return pending
+
+    def open_commit(self):
+        """Call at the end of the flush write, before its transaction commits."""
+        with self._window:
+            while self._readers:
+                self._window.wait()
+            self._committing += 1
+
+    def committed(self, pending: dict[str, SourceStats], window_open: bool):
+        """Drop stats from take() once their flush has committed."""
+        with self._lock:
+            self._drop_in_flight(pending)
+        if window_open:
+            self._close_commit()
+
+    def restore(self, pending: dict[str, SourceStats], window_open: bool = False):
+        """Put back stats from take() whose flush failed."""
+        with self._lock:
+            self._drop_in_flight(pending)
+            for source, stats in pending.items():
+                newer = self._pending.get(source)
+                self._pending[source] = stats.then(newer) if newer else stats
+        if window_open:
+            self._close_commit()
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """Hold off flush commits while reading the tables and snapshot()."""
+        with self._window:
+            while self._committing:
+                self._window.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._window:
+                self._readers -= 1
+                self._window.notify_all()
+
+    def snapshot(self) -> dict[str, SourceStats]:
+        """Stats in flight and pending, oldest first, as copies."""
+        with self._lock:
+            merged: dict[str, SourceStats] = {}
+            for batch in (*self._in_flight, self._pending):
+                for source, stats in batch.items():
+                    older = merged.get(source)
+                    merged[source] = older.then(stats) if older else replace(stats, buckets=dict(stats.buckets))
+            return merged
+
+    def _drop_in_flight(self, pending: dict[str, SourceStats]):
+        self._in_flight = [batch for batch in self._in_flight if batch is not pending]
+
+    def _close_commit(self):
+        with self._window:
+            self._committing -= 1
+            self._window.notify_all()
+
+
+def create_tables(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS source_latency (
+            source TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, bucket)
+        ) WITHOUT ROWID
+    """)
+
+
+def flush(cursor: sqlite3.Cursor, pending: dict[str, SourceStats]):
+    """Fold pending stats into source_health and source_latency."""
+    cursor.executemany("""
+        INSERT INTO source_health (source, last_success, last_failure, consecutive_failures, total_calls, total_failures)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            last_success = COALESCE(excluded.last_success, last_success),
+            last_failure = COALESCE(excluded.last_failure, last_failure),
+            consecutive_failures = CASE WHEN ? THEN excluded.consecutive_failures
+                                   ELSE consecutive_failures + excluded.consecutive_failures END,
+            total_calls = total_calls + excluded.total_calls,
+            total_failures = total_failures + excluded.total_failures
+    """, [
+        (source, s.last_success, s.last_failure, s.consecutive_failures, s.total_calls, s.total_failures, s.reset)
+        for source, s in pending.items()
+    ])
+    cursor.executemany("""
+        INSERT INTO source_latency (source, bucket, count) VALUES (?, ?, ?)
+        ON CONFLICT(source, bucket) DO UPDATE SET count = count + excluded.count
+    """, [
+        (source, bucket, count)
+        for source, s in pending.items()
+        for bucket, count in s.buckets.items()
+    ])
+
+
+def read_health(cursor: sqlite3.Cursor, pending: dict[str, SourceStats]) -> list[dict[str, Any]]:
+    """Assemble the get_source_health result from the tables and pending stats."""
+    stats: dict[str, SourceStats] = {}
+    for row in cursor.execute("SELECT * FROM source_health"):
+        stats[row["source"]] = SourceStats(
+            total_calls=row["total_calls"] or 0,
+            total_failures=row["total_failures"] or 0,
+            consecutive_failures=row["consecutive_failures"] or 0,
+            reset=True,
+            last_success=row["last_success"],
+            last_failure=row["last_failure"],
+        )
+    for row in cursor.execute("SELECT source, bucket, count FROM source_latency"):
+        if row["source"] in stats:
+            stats[row["source"]].buckets[row["bucket"]] = row["count"]
+
+    for source, newer in pending.items():
+        stats[source] = stats[source].then(newer) if source in stats else newer
+
+    return [
+        {
+            "source": source,
+            "last_success": s.last_success,
+            "last_failure": s.last_failure,
+            "consecutive_failures": s.consecutive_failures,
+            "total_calls": s.total_calls,
+            "total_failures": s.total_failures,
+            "latency_ms": percentiles(s.buckets),
+        }
+        for source, s in sorted(stats.items())
+    ]
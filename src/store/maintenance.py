@@ -0,0 +1,91 @@
+"""Maintenance commands for the Signex database.
+
+Usage:
+    uv run python -m src.store.maintenance [--db data/signex.db] {rebuild-search,fingerprint,rebuild-stats,compress,vacuum}
+    uv run python -m src.store.maintenance archive --days 180 --watch ai-tools=30
+"""
+
+import argparse
+
+from src.store import retention
+from src.store.database import Database
+
+
+def rebuild_search(db: Database, args: argparse.Namespace):
+    """Rebuild the full-text search index from all stored items."""
+    db.rebuild_search_index()
+    print("Search index rebuilt.")
+
+
+def fingerprint(db: Database, args: argparse.Namespace):
+    """Fingerprint existing items and link their near-duplicates."""
+    count = db.backfill_fingerprints()
+    print(f"Fingerprinted {count} items.")
+
+
+def rebuild_stats(db: Database, args: argparse.Namespace):
+    """Recompute run statistics rollups from the analyses table."""
+    db.rebuild_run_stats()
+    print("Run statistics rebuilt.")
+
+
+def compress(db: Database, args: argparse.Namespace):
+    """Convert inline item bodies to compressed blobs and shrink the file."""
+    count = db.compress_items()
+    pruned = db.prune_blobs()
+    db.connection.execute("VACUUM")
+    print(f"Compressed {count} items, pruned {pruned} unused blobs.")
+
+
+def archive(db: Database, args: argparse.Namespace):
+    """Move items past their retention period into monthly archive files."""
+    policy = {}
+    for spec in args.watch:
+        name, _, days = spec.rpartition("=")
+        if not name or not days.isdigit():
+            raise SystemExit(f"--watch expects NAME=DAYS, got {spec!r}")
+        policy[name] = int(days)
+
+    moved = db.archive_items(policy, default_days=args.days)
+    for month, count in sorted(moved.items()):
+        print(f"{month}: archived {count} items")
+    print(f"Archived {sum(moved.values())} items.")
+
+
+def vacuum(db: Database, args: argparse.Namespace):
+    """Rebuild the file with incremental auto-vacuum enabled."""
+    db.connection.execute(f"PRAGMA auto_vacuum = {retention.INCREMENTAL}")
+    db.connection.execute("VACUUM")
+    print("Database vacuumed.")
+
+
+COMMANDS = {
+    "rebuild-search": rebuild_search,
+    "fingerprint": fingerprint,
+    "rebuild-stats": rebuild_stats,
+    "compress": compress,
+    "archive": archive,
+    "vacuum": vacuum,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signex database maintenance")
+    parser.add_argument("--db", default="data/signex.db", help="Path to the SQLite database")
+    parser.add_argument("--days", type=int, default=None,
+                        help="archive: days to keep items of watches without their own --watch policy")
+    parser.add_argument("--watch", action="append", default=[], metavar="NAME=DAYS",
+                        help="archive: days to keep items of one watch (repeatable)")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.init()
+    try:
+        COMMANDS[args.command](db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Opt-in query instrumentation for the Signex database.
+
+With Database(instrument=True) every connection is opened with
+InstrumentedConnection, which times each SQL statement (execute plus the
+fetches that drain it), counts the rows it returned or changed, and times
+commits. Public Database methods decorated with @timed record their own
+call latency and the rows they returned, inserted or archived. Statements slower than slow_query_ms go to a bounded slow
+query log. Database.metrics() returns a snapshot of all of it.
+
+Statements are grouped by their text with whitespace collapsed and
+placeholder lists folded, so ``IN (?, ?, ?)`` chunks of any size share one
+entry. Latency percentiles reuse the source-health histograms
+(src.store.health), so they are within about 10%.
+"""
+
+import functools
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from src.store.health import latency_bucket, percentiles
+
+SLOW_QUERY_LOG_SIZE = 100
+# Histogram unit: statements are mostly well under a millisecond
+_RESOLUTION = 1e-6
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Grouping key for a statement."""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+
+class _Timing:
+    """Count, total and histogram for one method, statement or commits."""
+
+    __slots__ = ("calls", "errors", "rows", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: dict[int, int] = {}
+
+    def add(self, elapsed: float, rows: int = 0, error: bool = False):
+        self.calls += 1
+        self.errors += error
+        self.rows += rows
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        bucket = latency_bucket(elapsed, _RESOLUTION)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        latency = percentiles(self.buckets, _RESOLUTION) or {}
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            **{key: value for key, value in latency.items() if key != "count"},
+        }
+
+
+class Metrics:
+    """Thread-safe store for everything the instrumentation records."""
+
+    def __init__(self, slow_query_ms: float = 100.0):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._methods: dict[str, _Timing] = {}
+        self._statements: dict[str, _Timing] = {}
+        self._commits = _Timing()
+        self._slow: deque[dict[str, Any]] = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+    def record_method(self, name: str, elapsed: float, rows: int = 0, error: bool = False):
+        with self._lock:
+            self._methods.setdefault(name, _Timing()).add(elapsed, rows, error)
+
+    def record_statement(self, sql: str, elapsed: float, rows: int, error: bool = False):
+        key = normalize_sql(sql)
+        with self._lock:
+            self._statements.setdefault(key, _Timing()).add(elapsed, rows, error)
+            if key == "COMMIT":
+                self._commits.add(elapsed)
+            if elapsed * 1000 >= self.slow_query_ms:
+                self._slow.append({
+                    "sql": key,
+                    "elapsed_ms": round(elapsed * 1000, 3),
+                    "rows": rows,
+                    "error": error,
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "thread": threading.current_thread().name,
+                })
+
+    def record_commit(self, elapsed: float):
+        with self._lock:
+            self._commits.add(elapsed)
+
+    def snapshot(self, reset: bool = False) -> dict[str, Any]:
+        with self._lock:
+            result = {
+                "methods": {name: t.snapshot() for name, t in sorted(self._methods.items())},
+                "statements": {
+                    sql: t.snapshot()
+                    for sql, t in sorted(self._statements.items(), key=lambda kv: -kv[1].total)
+                },
+                "commits": self._commits.snapshot(),
+                "slow_queries": list(self._slow),
+            }
+            if reset:
+                self._methods.clear()
+                self._statements.clear()
+                self._commits = _Timing()
+                self._slow.clear()
+        return result
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to its connection's Metrics.
+
+    A query is recorded once it is drained (or the cursor moves on to
+    another statement or closes), so its time includes the fetches.
+    """
+
+    metrics: Metrics
+    _pending: list | None = None
+
+    def execute(self, sql, parameters=(), /):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error:
+            self.metrics.record_statement(sql, time.perf_counter() - start, 0, error=True)
+            raise
+        self._started(sql, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_parameters, /):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error:
+            self.metrics.record_statement(sql, time.perf_counter() - start, 0, error=True)
+            raise
+        self._started(sql, time.perf_counter() - start)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(time.perf_counter() - start, len(rows), len(rows) < (size or self.arraysize))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(time.perf_counter() - start, 0, True)
+            raise
+        self._fetched(time.perf_counter() - start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Statements read with a single fetchone() are never drained
+        self._finish()
+
+    def _started(self, sql: str, elapsed: float):
+        if self.description is None:
+            self.metrics.record_statement(sql, elapsed, max(self.rowcount, 0))
+        else:
+            self._pending = [sql, elapsed, 0]
+
+    def _fetched(self, elapsed: float, rows: int, done: bool):
+        if self._pending is None:
+            return
+        self._pending[1] += elapsed
+        self._pending[2] += rows
+        if done:
+            self._finish()
+
+    def _finish(self):
+        if self._pending is not None:
+            sql, elapsed, rows = self._pending
+            self._pending = None
+            self.metrics.record_statement(sql, elapsed, rows)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors and commits report to a Metrics instance.
+
+    Set ``metrics`` right after connecting.
+    """
+
+    metrics: Metrics
+
+    def cursor(self, factory=InstrumentedCursor):
+        cursor = super().cursor(factory)
+        cursor.metrics = self.metrics
+        return cursor
+
+    # The built-in shortcuts create plain cursors; route them through ours.
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        start = time.perf_counter()
+        super().commit()
+        self.metrics.record_commit(time.perf_counter() - start)
+
+
+def _result_rows(result: Any) -> int:
+    """Rows behind a Database method's result.
+
+    Lists count their entries, save results their "inserted" count and
+    {key: count} results (archive_items) the sum of the counts.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        if isinstance(result.get("inserted"), int):
+            return result["inserted"]
+        if result and all(type(value) is int for value in result.values()):
+            return sum(result.values())
+    return 0
+
+
+def timed(method):
+    """Record a Database method's latency and rows when instrumentation is on."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._metrics is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            self._metrics.record_method(name, time.perf_counter() - start, error=True)
+            raise
+        self._metrics.record_method(name, time.perf_counter() - start, _result_rows(result))
+        return result
+
+    return wrapper
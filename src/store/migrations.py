@@ -0,0 +1,367 @@
+"""Versioned schema migrations for the Signex database.
+
+The applied version is kept in SQLite's ``PRAGMA user_version``. Each
+migration runs in its own transaction and must be safe on databases created
+before versioning existed (which report version 0 but already have tables).
+"""
+
+import sqlite3
+from collections.abc import Callable
+
+from src.store import health, retention, rollups
+
+
+def _base_schema(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL,
+            source_id TEXT,
+            title TEXT,
+            url TEXT,
+            content TEXT,
+            metadata JSON,
+            fetched_at TIMESTAMP NOT NULL,
+            published_at TIMESTAMP,
+            watch_name TEXT,
+            UNIQUE(source, source_id)
+        )
+    """)
+
+    # Databases from before watch_name existed
+    if "watch_name" not in _columns(cursor, "items"):
+        cursor.execute("ALTER TABLE items ADD COLUMN watch_name TEXT")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analyses (
+            id INTEGER PRIMARY KEY,
+            watch_name TEXT NOT NULL,
+            run_at TIMESTAMP NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            lens TEXT,
+            report_path TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_items (
+            analysis_id INTEGER REFERENCES analyses(id),
+            item_id INTEGER REFERENCES items(id),
+            PRIMARY KEY (analysis_id, item_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS source_health (
+            source TEXT PRIMARY KEY,
+            last_success TEXT,
+            last_failure TEXT,
+            consecutive_failures INTEGER DEFAULT 0,
+            total_calls INTEGER DEFAULT 0,
+            total_failures INTEGER DEFAULT 0
+        )
+    """)
+
+
+def _query_indexes(cursor: sqlite3.Cursor):
+    # get_items / iter_items: unfiltered windows. Index order is
+    # (fetched_at, rowid), which is the keyset iter_items pages over.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_fetched_at ON items(fetched_at)")
+    # get_items(source=...) and get_items(watch_name=...) within a window
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_source_fetched_at ON items(source, fetched_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_watch_fetched_at ON items(watch_name, fetched_at)")
+    # Which analyses used an item
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_analysis_items_item_id
+        ON analysis_items(item_id, analysis_id)
+    """)
+
+
+def _search_index(cursor: sqlite3.Cursor):
+    # External-content FTS5 index over items, kept in sync by triggers.
+    # Builds without FTS5 skip this; Database.search_items reports it.
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                title, content,
+                content='items', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        if "no such module" in str(e):
+            return
+        raise
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, content ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO items_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """)
+
+    # Backfill items stored before the index existed
+    cursor.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+
+
+def _fingerprints(cursor: sqlite3.Cursor):
+    # Near-duplicate clusters: canonical_id points at the first item of the
+    # cluster and is NULL for canonical items themselves.
+    if "canonical_id" not in _columns(cursor, "items"):
+        cursor.execute("ALTER TABLE items ADD COLUMN canonical_id INTEGER REFERENCES items(id)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_canonical_id
+        ON items(canonical_id) WHERE canonical_id IS NOT NULL
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_fingerprints (
+            item_id INTEGER PRIMARY KEY REFERENCES items(id),
+            url_key TEXT,
+            simhash INTEGER,
+            band0 INTEGER,
+            band1 INTEGER,
+            band2 INTEGER,
+            band3 INTEGER
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_item_fingerprints_url_key
+        ON item_fingerprints(url_key) WHERE url_key IS NOT NULL
+    """)
+    for band in range(4):
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_item_fingerprints_band{band}
+            ON item_fingerprints(band{band}) WHERE band{band} IS NOT NULL
+        """)
+
+
+def _run_stats_rollups(cursor: sqlite3.Cursor):
+    rollups.create_tables(cursor)
+    rollups.rebuild(cursor)
+
+
+def _blob_storage(cursor: sqlite3.Cursor):
+    # Content-addressed bodies for Database(compress=True); see src.store.blobs
+    columns = _columns(cursor, "items")
+    if "content_hash" not in columns:
+        cursor.execute("ALTER TABLE items ADD COLUMN content_hash BLOB")
+    if "metadata_hash" not in columns:
+        cursor.execute("ALTER TABLE items ADD COLUMN metadata_hash BLOB")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash BLOB PRIMARY KEY,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_content_hash
+        ON items(content_hash) WHERE content_hash IS NOT NULL
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_metadata_hash
+        ON items(metadata_hash) WHERE metadata_hash IS NOT NULL
+    """)
+
+    # Search keeps reading items directly until the database stores blobs;
+    # see install_blob_search.
+
+
+def _archives(cursor: sqlite3.Cursor):
+    retention.create_tables(cursor)
+
+
+def _source_latency(cursor: sqlite3.Cursor):
+    health.create_tables(cursor)
+
+
+def _autoincrement_item_ids(cursor: sqlite3.Cursor):
+    # Archiving can delete the newest items, and a plain INTEGER PRIMARY KEY
+    # hands out MAX(id) + 1, so new items could take the IDs of archived
+    # ones. Rebuild items with AUTOINCREMENT and start it above every ID
+    # that was ever archived.
+    sql = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'items'").fetchone()[0]
+    if "AUTOINCREMENT" in sql.upper():
+        return
+
+    # Dropping items drops its indexes and triggers, and the view would
+    # block the rename; recreate them all from their stored definitions.
+    dependents = [
+        row[0] for row in cursor.execute("""
+            SELECT sql FROM sqlite_master
+            WHERE sql IS NOT NULL AND (tbl_name = 'items' AND type IN ('index', 'trigger') OR name = 'items_fulltext')
+            ORDER BY CASE type WHEN 'index' THEN 0 WHEN 'view' THEN 1 ELSE 2 END
+        """).fetchall()
+    ]
+    if _has_blob_search(cursor):
+        cursor.execute("DROP VIEW items_fulltext")
+
+    cursor.execute("""
+        CREATE TABLE items_autoincrement (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            source_id TEXT,
+            title TEXT,
+            url TEXT,
+            content TEXT,
+            metadata JSON,
+            fetched_at TIMESTAMP NOT NULL,
+            published_at TIMESTAMP,
+            watch_name TEXT,
+            canonical_id INTEGER REFERENCES items(id),
+            content_hash BLOB,
+            metadata_hash BLOB,
+            UNIQUE(source, source_id)
+        )
+    """)
+    columns = """
+        id, source, source_id, title, url, content, metadata, fetched_at, published_at, watch_name,
+        canonical_id, content_hash, metadata_hash
+    """
+    cursor.execute(f"INSERT INTO items_autoincrement ({columns}) SELECT {columns} FROM items")
+    cursor.execute("DROP TABLE items")
+    cursor.execute("ALTER TABLE items_autoincrement RENAME TO items")
+    for sql in dependents:
+        cursor.execute(sql)
+
+    db_path = next(row[2] for row in cursor.execute("PRAGMA database_list").fetchall() if row[1] == "main")
+    high_water = max(
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0],
+        retention.max_archived_id(cursor, db_path) if db_path else 0,
+    )
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'items'")
+    cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('items', ?)", (high_water,))
+
+
+# (version, description, migration). Append only; never renumber.
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "base schema", _base_schema),
+    (2, "query indexes for items and analyses", _query_indexes),
+    (3, "full-text search index over item titles and content", _search_index),
+    (4, "near-duplicate fingerprints and item clusters", _fingerprints),
+    (5, "run statistics rollups", _run_stats_rollups),
+    (6, "content-addressed blob storage", _blob_storage),
+    (7, "archive registry for item retention", _archives),
+    (8, "source latency histograms", _source_latency),
+    (9, "never reuse item IDs", _autoincrement_item_ids),
+]
+
+
+def _has_blob_search(cursor: sqlite3.Cursor) -> bool:
+    return cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'items_fulltext'"
+    ).fetchone() is not None
+
+
+def _install_search(cursor: sqlite3.Cursor, content_table: str, body: str):
+    """(Re)create items_fts over content_table, with triggers indexing body, and rebuild it."""
+    for trigger in ("items_fts_insert", "items_fts_delete", "items_fts_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS items_fts")
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE items_fts USING fts5(
+            title, content,
+            content='{content_table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, title, content) VALUES (new.id, new.title, {body.format(row="new")});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, {body.format(row="old")});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER items_fts_update AFTER UPDATE OF title, content, content_hash ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, {body.format(row="old")});
+            INSERT INTO items_fts(rowid, title, content) VALUES (new.id, new.title, {body.format(row="new")});
+        END
+    """)
+    cursor.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+
+
+def install_blob_search(cursor: sqlite3.Cursor) -> bool:
+    """Point the search index at compressed bodies as well as inline ones.
+
+    Called before a database first stores blobs. From then on the search
+    triggers call signex_decompress, so only connections that registered
+    it (src.store.blobs.register) can write items. Returns False if search
+    already reads through items_fulltext or FTS5 is unavailable.
+    """
+    if not has_table(cursor.connection, "items_fts") or _has_blob_search(cursor):
+        return False
+
+    cursor.execute("""
+        CREATE VIEW items_fulltext AS
+        SELECT i.id, i.title, COALESCE(i.content, signex_decompress(b.codec, b.data)) AS content
+        FROM items i LEFT JOIN blobs b ON b.hash = i.content_hash
+    """)
+    _install_search(cursor, "items_fulltext", """COALESCE({row}.content, (
+        SELECT signex_decompress(codec, data) FROM blobs WHERE hash = {row}.content_hash
+    ))""")
+    return True
+
+
+def has_table(connection: sqlite3.Connection, name: str) -> bool:
+    """Return True if a table (or virtual table) exists."""
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> set[str]:
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def schema_version(connection: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database."""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection) -> list[int]:
+    """Apply all pending migrations in order.
+
+    Returns the versions that were applied.
+    """
+    applied: list[int] = []
+
+    for version, _, migration in MIGRATIONS:
+        if schema_version(connection) >= version:
+            continue
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the lock
+            if schema_version(connection) < version:
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                applied.append(version)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    return applied
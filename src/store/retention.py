@@ -0,0 +1,215 @@
+"""Time-partitioned retention for sensor items.
+
+Database.archive_items moves items older than a per-watch policy out of the
+hot database into one SQLite file per month of fetched_at, next to it:
+
+    data/signex.db
+    data/archive/signex-2026-01.db
+    data/archive/signex-2026-02.db
+
+Archived rows keep their IDs, so analysis_items links and canonical_id
+references still resolve, and items.id is AUTOINCREMENT so an archived ID
+is never handed out again. The ``archives`` table in the hot database
+records which months have been archived; get_items ATTACHes the ones a
+``since`` reaches into. Bodies are stored inline (decompressed) so each
+archive file is self-contained.
+
+Archived items leave the search index and the near-duplicate fingerprints.
+Rows are copied to the archive file and committed before they are deleted
+from the hot file, so an interrupted run leaves copies in both places and
+the next run finishes the move.
+"""
+
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+ARCHIVE_DIR = "archive"
+
+# The hot database's auto_vacuum mode for incremental vacuum
+INCREMENTAL = 2
+# Pages freed per incremental_vacuum statement
+VACUUM_CHUNK = 1024
+
+
+def create_tables(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS archives (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            items INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+    """)
+
+
+def archive_path(db_path: str, month: str) -> Path:
+    """Archive file for a month (YYYY-MM) of the database at db_path."""
+    db_file = Path(db_path)
+    return db_file.parent / ARCHIVE_DIR / f"{db_file.stem}-{month}.db"
+
+
+def expired_filter(
+    policy: dict[str, int],
+    default_days: int | None,
+    now: datetime | None = None
+) -> tuple[str, list[Any]]:
+    """WHERE clause matching items past their watch's retention period.
+
+    Args:
+        policy: {watch_name: days to keep}
+        default_days: Days to keep items of other watches (and items
+            without one); None keeps them forever
+        now: Reference time (default: current UTC time)
+    """
+    now = now or datetime.now(timezone.utc)
+    clauses: list[str] = []
+    params: list[Any] = []
+
+    for watch_name, days in sorted(policy.items()):
+        clauses.append("(watch_name = ? AND fetched_at < ?)")
+        params += [watch_name, (now - timedelta(days=days)).isoformat()]
+
+    if default_days is not None:
+        others = ", ".join("?" * len(policy))
+        clauses.append(
+            f"((watch_name IS NULL OR watch_name NOT IN ({others})) AND fetched_at < ?)"
+            if policy else "fetched_at < ?"
+        )
+        params += [*sorted(policy), (now - timedelta(days=default_days)).isoformat()]
+
+    return " OR ".join(clauses) or "0", params
+
+
+def write_archive(path: Path, rows: list[sqlite3.Row]):
+    """Copy item rows (all item columns) into an archive file and commit."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                source_id TEXT,
+                title TEXT,
+                url TEXT,
+                content TEXT,
+                metadata JSON,
+                fetched_at TIMESTAMP NOT NULL,
+                published_at TIMESTAMP,
+                watch_name TEXT,
+                canonical_id INTEGER
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_items_fetched_at ON items(fetched_at)")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_items_source_fetched_at ON items(source, fetched_at)")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_items_watch_fetched_at ON items(watch_name, fetched_at)")
+        columns = rows[0].keys()
+        connection.executemany(
+            f"INSERT OR REPLACE INTO items ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [tuple(row) for row in rows],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def record_archive(cursor: sqlite3.Cursor, month: str, path: Path, count: int):
+    """Register archived rows for a month in the hot database.
+
+    path is stored relative to the hot database's directory.
+    """
+    cursor.execute("""
+        INSERT INTO archives (month, path, items, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(month) DO UPDATE SET
+            path = excluded.path,
+            items = items + excluded.items,
+            updated_at = excluded.updated_at
+    """, (month, path.relative_to(path.parent.parent).as_posix(), count, datetime.now(timezone.utc).isoformat()))
+
+
+def months_between(
+    cursor: sqlite3.Cursor,
+    db_path: str,
+    since: str,
+    until: str | None
+) -> list[tuple[str, Path]]:
+    """Archived months overlapping [since, until], as (month, path), newest first.
+
+    Files that have gone missing are skipped.
+    """
+    sql = "SELECT month, path FROM archives WHERE month >= ?"
+    params = [since[:7]]
+    if until:
+        sql += " AND month <= ?"
+        params.append(until[:7])
+    sql += " ORDER BY month DESC"
+
+    base = Path(db_path).parent
+    return [
+        (row[0], base / row[1])
+        for row in cursor.execute(sql, params).fetchall()
+        if (base / row[1]).exists()
+    ]
+
+
+def max_archived_id(cursor: sqlite3.Cursor, db_path: str) -> int:
+    """Highest item ID in any registered archive file (0 if none)."""
+    base = Path(db_path).parent
+    highest = 0
+    for (path,) in cursor.execute("SELECT path FROM archives").fetchall():
+        if not (base / path).exists():
+            continue
+        archive = sqlite3.connect(base / path)
+        try:
+            highest = max(highest, archive.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0])
+        finally:
+            archive.close()
+    return highest
+
+
+@contextmanager
+def attached(connection: sqlite3.Connection, paths: list[Path]) -> Iterator[list[str]]:
+    """ATTACH archive files for the duration of a query; yields their schema names."""
+    aliases: list[str] = []
+    try:
+        for i, path in enumerate(paths):
+            alias = f"archive_{i}"
+            connection.execute("ATTACH DATABASE ? AS " + alias, (str(path),))
+            aliases.append(alias)
+        yield aliases
+    finally:
+        for alias in aliases:
+            connection.execute(f"DETACH DATABASE {alias}")
+
+
+def incremental_vacuum(connection: sqlite3.Connection, chunk: int = VACUUM_CHUNK) -> int:
+    """Return freed pages to the filesystem if the file allows it.
+
+    Pages are freed up to chunk at a time, each chunk in its own short write
+    transaction, so the lock is never held for the whole freelist. The
+    connection must not be in a transaction. Returns the pages freed.
+
+    Databases created before retention existed have auto_vacuum off; run
+    ``python -m src.store.maintenance vacuum`` once to convert them.
+    """
+    if connection.in_transaction:
+        raise RuntimeError("incremental_vacuum must run outside a transaction.")
+    if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL:
+        return 0
+
+    freed = 0
+    free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    while free:
+        # execute() steps a statement once, and incremental_vacuum frees one
+        # page per step; executescript() steps it to completion.
+        connection.executescript(f"PRAGMA incremental_vacuum({chunk})")
+        remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        if remaining >= free:
+            break
+        freed += free - remaining
+        free = remaining
+    return freed
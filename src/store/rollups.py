@@ -0,0 +1,204 @@
+"""Incrementally maintained run statistics for Signex.
+
+save_analysis updates these rollups in the same transaction as the
+analyses insert, so get_run_stats reads a handful of pre-aggregated rows
+instead of scanning every analysis ever recorded:
+
+- run_stats_watch / run_stats_watch_lenses: all-time totals per watch
+- run_stats_daily / run_stats_daily_lenses: per watch per day, used for
+  by_date and for date-filtered queries
+"""
+
+import sqlite3
+from typing import Any
+
+
+def create_tables(cursor: sqlite3.Cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS run_stats_watch (
+            watch_name TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL DEFAULT 0,
+            total_items INTEGER NOT NULL DEFAULT 0,
+            last_run TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS run_stats_watch_lenses (
+            watch_name TEXT NOT NULL,
+            lens TEXT NOT NULL,
+            last_run TIMESTAMP,
+            PRIMARY KEY (watch_name, lens)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS run_stats_daily (
+            watch_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            runs INTEGER NOT NULL DEFAULT 0,
+            total_items INTEGER NOT NULL DEFAULT 0,
+            last_run TIMESTAMP,
+            PRIMARY KEY (watch_name, day)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_run_stats_daily_day
+        ON run_stats_daily(day, watch_name, runs, total_items, last_run)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS run_stats_daily_lenses (
+            watch_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            lens TEXT NOT NULL,
+            last_run TIMESTAMP,
+            PRIMARY KEY (watch_name, day, lens)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_run_stats_daily_lenses_day
+        ON run_stats_daily_lenses(day, watch_name, lens, last_run)
+    """)
+
+
+def rebuild(cursor: sqlite3.Cursor):
+    """Recompute every rollup from the analyses table."""
+    for table in ("run_stats_watch", "run_stats_watch_lenses", "run_stats_daily", "run_stats_daily_lenses"):
+        cursor.execute(f"DELETE FROM {table}")
+
+    cursor.execute("""
+        INSERT INTO run_stats_watch (watch_name, runs, total_items, last_run)
+        SELECT watch_name, COUNT(*), SUM(COALESCE(item_count, 0)), MAX(run_at)
+        FROM analyses GROUP BY watch_name
+    """)
+    cursor.execute("""
+        INSERT INTO run_stats_watch_lenses (watch_name, lens, last_run)
+        SELECT watch_name, lens, MAX(run_at)
+        FROM analyses WHERE lens IS NOT NULL AND lens != ''
+        GROUP BY watch_name, lens
+    """)
+    cursor.execute("""
+        INSERT INTO run_stats_daily (watch_name, day, runs, total_items, last_run)
+        SELECT watch_name, substr(run_at, 1, 10), COUNT(*), SUM(COALESCE(item_count, 0)), MAX(run_at)
+        FROM analyses GROUP BY watch_name, substr(run_at, 1, 10)
+    """)
+    cursor.execute("""
+        INSERT INTO run_stats_daily_lenses (watch_name, day, lens, last_run)
+        SELECT watch_name, substr(run_at, 1, 10), lens, MAX(run_at)
+        FROM analyses WHERE lens IS NOT NULL AND lens != ''
+        GROUP BY watch_name, substr(run_at, 1, 10), lens
+    """)
+
+
+def record_run(cursor: sqlite3.Cursor, watch_name: str, run_at: str, item_count: int, lens: str | None):
+    """Fold one analysis run into the rollups."""
+    item_count = item_count or 0
+    day = run_at[:10]
+
+    cursor.execute("""
+        INSERT INTO run_stats_watch (watch_name, runs, total_items, last_run)
+        VALUES (?, 1, ?, ?)
+        ON CONFLICT(watch_name) DO UPDATE SET
+            runs = runs + 1,
+            total_items = total_items + excluded.total_items,
+            last_run = MAX(last_run, excluded.last_run)
+    """, (watch_name, item_count, run_at))
+    cursor.execute("""
+        INSERT INTO run_stats_daily (watch_name, day, runs, total_items, last_run)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT(watch_name, day) DO UPDATE SET
+            runs = runs + 1,
+            total_items = total_items + excluded.total_items,
+            last_run = MAX(last_run, excluded.last_run)
+    """, (watch_name, day, item_count, run_at))
+
+    if lens:
+        cursor.execute("""
+            INSERT INTO run_stats_watch_lenses (watch_name, lens, last_run)
+            VALUES (?, ?, ?)
+            ON CONFLICT(watch_name, lens) DO UPDATE SET last_run = MAX(last_run, excluded.last_run)
+        """, (watch_name, lens, run_at))
+        cursor.execute("""
+            INSERT INTO run_stats_daily_lenses (watch_name, day, lens, last_run)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(watch_name, day, lens) DO UPDATE SET last_run = MAX(last_run, excluded.last_run)
+        """, (watch_name, day, lens, run_at))
+
+
+def read_stats(
+    cursor: sqlite3.Cursor,
+    since: str | None = None,
+    until: str | None = None,
+    watch_name: str | None = None
+) -> dict[str, Any]:
+    """Assemble the get_run_stats result from the rollups.
+
+    since/until are compared by day (the first 10 characters of an ISO
+    date or timestamp), inclusive.
+    """
+    ranged = bool(since or until)
+    day_filter = ""
+    day_params: list[Any] = []
+    if since:
+        day_filter += " AND day >= ?"
+        day_params.append(since[:10])
+    if until:
+        day_filter += " AND day <= ?"
+        day_params.append(until[:10])
+
+    watch_filter = " AND watch_name = ?" if watch_name else ""
+    watch_params = [watch_name] if watch_name else []
+
+    if ranged:
+        watch_rows = cursor.execute(f"""
+            SELECT watch_name, SUM(runs) AS runs, SUM(total_items) AS total_items, MAX(last_run) AS last_run
+            FROM run_stats_daily WHERE 1=1{day_filter}{watch_filter}
+            GROUP BY watch_name
+        """, day_params + watch_params).fetchall()
+        lens_rows = cursor.execute(f"""
+            SELECT watch_name, lens, MAX(last_run) AS last_run
+            FROM run_stats_daily_lenses WHERE 1=1{day_filter}{watch_filter}
+            GROUP BY watch_name, lens
+        """, day_params + watch_params).fetchall()
+    else:
+        watch_rows = cursor.execute(f"""
+            SELECT watch_name, runs, total_items, last_run
+            FROM run_stats_watch WHERE 1=1{watch_filter}
+        """, watch_params).fetchall()
+        lens_rows = cursor.execute(f"""
+            SELECT watch_name, lens, last_run
+            FROM run_stats_watch_lenses WHERE 1=1{watch_filter}
+        """, watch_params).fetchall()
+
+    # Most recent first. Sorted here rather than in SQL: the rows are one
+    # per watch (or watch and lens), and ORDER BY an aggregate would need a
+    # temporary b-tree on every query.
+    def by_last_run(rows: list[sqlite3.Row]) -> list[sqlite3.Row]:
+        return sorted(rows, key=lambda row: row["last_run"] or "", reverse=True)
+
+    by_watch: dict[str, Any] = {}
+    for row in by_last_run(watch_rows):
+        by_watch[row["watch_name"]] = {
+            "runs": row["runs"],
+            "total_items": row["total_items"],
+            "last_run": row["last_run"],
+            "lenses": [],
+        }
+    for row in by_last_run(lens_rows):
+        if row["watch_name"] in by_watch:
+            by_watch[row["watch_name"]]["lenses"].append(row["lens"])
+
+    by_date: dict[str, Any] = {}
+    for row in cursor.execute(f"""
+        SELECT day, SUM(runs) AS runs, SUM(total_items) AS total_items
+        FROM run_stats_daily WHERE 1=1{day_filter}{watch_filter}
+        GROUP BY day ORDER BY day DESC
+    """, day_params + watch_params):
+        by_date[row["day"]] = {"runs": row["runs"], "total_items": row["total_items"]}
+
+    return {
+        "by_watch": by_watch,
+        "by_date": by_date,
+        "totals": {
+            "runs": sum(w["runs"] for w in by_watch.values()),
+            "total_items": sum(w["total_items"] for w in by_watch.values()),
+        },
+    }
@@ -0,0 +1,127 @@
+"""Single-writer thread for concurrent Signex database access."""
+
+import queue
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+
+class WriterThread(threading.Thread):
+    """Owns the only write connection and group-commits queued jobs.
+
+    Each job runs inside its own savepoint, so a failing job is rolled back
+    and reported to its caller without affecting the rest of the group.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 256):
+        super().__init__(name="signex-db-writer", daemon=True)
+        self._connect = connect
+        self._max_batch = max_batch
+        self._queue: queue.Queue[tuple[WriteJob, Future] | None] = queue.Queue()
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        # Guards _closed so no job is queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        super().start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def submit(self, job: WriteJob) -> Any:
+        """Queue a write job and block until its group has committed."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed or not self.is_alive():
+                raise RuntimeError("Database writer is not running.")
+            self._queue.put((job, future))
+        return future.result()
+
+    def stop(self):
+        """Drain pending jobs, then close the write connection."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        try:
+            connection = self._connect()
+            connection.isolation_level = None
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        try:
+            stopping = False
+            while not stopping:
+                job = self._queue.get()
+                if job is None:
+                    break
+                jobs = [job]
+                while len(jobs) < self._max_batch:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    jobs.append(job)
+                self._commit_group(connection, jobs)
+        finally:
+            connection.close()
+            self._fail_pending()
+
+    def _fail_pending(self):
+        """Refuse new jobs and fail any still queued, so no caller waits forever."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                job[1].set_exception(RuntimeError("Database writer stopped before running this job."))
+
+    @staticmethod
+    def _commit_group(connection: sqlite3.Connection, jobs: list[tuple[WriteJob, Future]]):
+        results: list[tuple[Future, Any, BaseException | None]] = []
+
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for job, future in jobs:
+                connection.execute("SAVEPOINT job")
+                try:
+                    result = job(connection)
+                except BaseException as e:
+                    connection.execute("ROLLBACK TO job")
+                    connection.execute("RELEASE job")
+                    results.append((future, None, e))
+                else:
+                    connection.execute("RELEASE job")
+                    results.append((future, result, None))
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for _, future in jobs:
+                future.set_exception(e)
+            return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,26 @@
+"""Database.save_items_bulk accepts any iterable of items as one batch."""
+
+import pytest
+
+from src.store.bench import make_items
+from src.store.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "signex.db"))
+    database.init()
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("wrap", [list, tuple, iter, lambda items: (item for item in items)],
+                         ids=["list", "tuple", "iterator", "generator"])
+def test_any_iterable_is_one_batch(db, wrap):
+    assert db.save_items_bulk(wrap(make_items(30)))["inserted"] == 30
+
+
+def test_iterable_of_batches(db):
+    batches = (make_items(10, seed=seed) for seed in range(3))
+    assert db.save_items_bulk(batches)["inserted"] == 30
+    assert db.save_items_bulk([])["inserted"] == 0
@@ -0,0 +1,84 @@
+"""Concurrent mode (see src.store.writer): many sensor threads, one writer."""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.store.bench import make_items
+from src.store.database import Database
+from src.store.writer import WriterThread
+
+
+def test_submit_after_stop_is_refused():
+    writer = WriterThread(lambda: sqlite3.connect(":memory:", check_same_thread=False))
+    writer.start()
+
+    # Hold the writer inside a job so stop() leaves its sentinel queued
+    busy, release = threading.Event(), threading.Event()
+    pool = ThreadPoolExecutor(max_workers=2)
+    blocked = pool.submit(writer.submit, lambda connection: (busy.set(), release.wait()))
+    busy.wait()
+    stopping = pool.submit(writer.stop)
+    while writer._queue.empty():
+        time.sleep(0.001)
+
+    with pytest.raises(RuntimeError):
+        writer.submit(lambda connection: None)
+
+    release.set()
+    blocked.result(timeout=10)
+    stopping.result(timeout=10)
+    pool.shutdown()
+    assert not writer.is_alive()
+
+
+@pytest.mark.parametrize("sensors", [4, 16])
+def test_parallel_sensors_lose_nothing(tmp_path, sensors):
+    db = Database(str(tmp_path / "signex.db"), concurrent=True)
+    db.init()
+    per_sensor, batch = 200, 20
+    errors: list[BaseException] = []
+    writing = threading.Event()
+    writing.set()
+
+    def sensor(n: int):
+        items = make_items(per_sensor, seed=n, content_size=200)
+        for item in items:
+            item.source_id = f"s{n}-{item.source_id}"
+        try:
+            for start in range(0, per_sensor, batch):
+                save = db.save_items_bulk if start % (2 * batch) else db.save_items
+                save(items[start:start + batch], watch_name=f"watch-{n % 3}")
+                db.update_source_health(f"sensor-{n}", True, 0.01)
+                db.get_source_health()
+        except BaseException as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            while writing.is_set():
+                db.get_items(watch_name="watch-0")
+                sum(1 for _ in db.iter_items(columns=["title", "url"], chunk_size=100))
+        except BaseException as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    writers = [threading.Thread(target=sensor, args=(n,)) for n in range(sensors)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    writing.clear()
+    for thread in readers:
+        thread.join()
+
+    lost = sensors * per_sensor - db.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    health = {row["source"]: row["total_calls"] for row in db.get_source_health()}
+    db.close()
+
+    assert errors == []
+    assert lost == 0
+    assert health == {f"sensor-{n}": per_sensor // batch for n in range(sensors)}
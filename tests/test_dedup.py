@@ -0,0 +1,89 @@
+"""Cross-source near-duplicate detection (see src.store.dedup)."""
+
+import pytest
+
+from src.store import dedup
+from src.store.database import Database
+from src.store.dedup import MAX_DISTANCE, canonicalize_url, hamming, simhash
+from src.store.models import SensorItem
+
+STORY = (
+    "Open source coding agent tops the benchmark after a surprise release, "
+    "with maintainers reporting lower latency and a new plugin api for tools"
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "signex.db"))
+    database.init()
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://www.example.com/post/1?utm_source=hn&utm_medium=x&id=7", "example.com/post/1?id=7"),
+    ("http://m.example.com/post/1/?fbclid=abc&ref=home#comments", "example.com/post/1"),
+    ("https://amp.example.com:443//post//1", "example.com/post/1"),
+    ("https://example.com:8080/a?b=2&a=1", "example.com:8080/a?a=1&b=2"),
+    ("https://www.co.uk/page", "co.uk/page"),
+    ("https://WWW.Example.COM", "example.com/"),
+])
+def test_canonicalize_url(url, key):
+    assert canonicalize_url(url) == key
+
+
+@pytest.mark.parametrize("url", [None, "", "/relative/path", "not a url", "http://[::1"])
+def test_canonicalize_url_rejects(url):
+    assert canonicalize_url(url) is None
+
+
+def test_simhash():
+    assert simhash(STORY) == simhash(STORY.upper() + ", " + STORY)
+    # One edit to a long body moves only a few bits
+    body = " ".join(f"word{i}" for i in range(200))
+    assert hamming(simhash(body), simhash(body + " updated")) <= MAX_DISTANCE
+    assert hamming(simhash(body), simhash(body.replace("word17 ", ""))) <= MAX_DISTANCE
+    assert hamming(simhash(body), simhash(body[:len(body) // 2])) > MAX_DISTANCE
+    assert hamming(simhash(STORY), simhash("Quarterly earnings beat forecasts as the startup closes a funding round")) > MAX_DISTANCE
+    assert simhash("too few words here") is None
+
+
+@pytest.mark.parametrize("flipped, linked", [(MAX_DISTANCE, True), (MAX_DISTANCE + 1, False)])
+def test_distance_threshold(db, monkeypatch, flipped, linked):
+    base = 0x0123_4567_89AB_CDEF
+    hashes = {"first": base, "second": base ^ ((1 << flipped) - 1)}
+    monkeypatch.setattr(dedup, "simhash", lambda text: hashes[text.split()[0]])
+
+    ids = db.save_items_bulk([
+        SensorItem(source="rss", source_id=name, title=name, url=f"https://example.com/{name}")
+        for name in hashes
+    ])["item_ids"]
+
+    canonical = {item["id"]: item["canonical_id"] for item in db.get_items()}
+    assert canonical[ids[1]] == (ids[0] if linked else None)
+
+
+def test_clusters_and_canonical_only(db):
+    first = db.save_items_bulk([
+        SensorItem(source="hacker_news", source_id="1", title="Coding agent release", content=STORY,
+                   url="https://example.com/story"),
+        SensorItem(source="reddit", source_id="2", title="Coding agent release", content=STORY,
+                   url="https://reddit.com/r/x/2"),
+        SensorItem(source="rss", source_id="3", title="Unrelated", content="nothing in common " * 3,
+                   url="https://www.example.com/story?utm_source=rss"),
+        SensorItem(source="rss", source_id="4", title="Other news", content="a different story entirely, " * 2,
+                   url="https://example.org/other"),
+    ])
+    story, reddit, by_url, other = first["item_ids"]
+    assert first["clusters"] == {story: 3}
+
+    second = db.save_items_bulk([
+        SensorItem(source="brave", source_id="5", title="Coding agent release", content=STORY,
+                   url="https://news.example.net/5"),
+    ])
+    assert second["clusters"] == {story: 4}
+
+    canonical = {item["id"]: item["canonical_id"] for item in db.get_items()}
+    assert canonical == {story: None, reddit: story, by_url: story, other: None, second["item_ids"][0]: story}
+    assert sorted(item["id"] for item in db.get_items(canonical_only=True)) == [story, other]
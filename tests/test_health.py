@@ -0,0 +1,35 @@
+"""Buffered source health (see src.store.health)."""
+
+import threading
+import time
+
+from src.store.database import Database
+
+
+def test_flush_in_progress_stays_visible(tmp_path):
+    db = Database(str(tmp_path / "signex.db"), concurrent=True, health_flush_interval=3600)
+    db.init()
+    for i in range(10):
+        db.update_source_health("rss", i % 2 == 0, 0.01)
+
+    # Hold the writer so the flush is taken from the buffer but not committed
+    busy, release = threading.Event(), threading.Event()
+    blocker = threading.Thread(target=db._write, args=(lambda connection: (busy.set(), release.wait()),))
+    blocker.start()
+    busy.wait()
+    flusher = threading.Thread(target=db.flush_source_health)
+    flusher.start()
+    try:
+        while db._health._pending:
+            time.sleep(0.001)
+        during = db.get_source_health()
+    finally:
+        release.set()
+    blocker.join()
+    flusher.join()
+    after = db.get_source_health()
+    db.close()
+
+    assert during == after
+    assert [(h["source"], h["total_calls"], h["total_failures"]) for h in after] == [("rss", 10, 5)]
+    assert after[0]["latency_ms"]["count"] == 10
@@ -0,0 +1,20 @@
+"""Opt-in instrumentation (see src.store.metrics)."""
+
+from src.store.bench import make_items
+from src.store.database import Database
+
+
+def test_methods_count_rows(tmp_path):
+    db = Database(str(tmp_path / "signex.db"), instrument=True)
+    db.init()
+    db.save_items(make_items(150))
+    db.save_items_bulk(make_items(50, seed=1))
+    db.save_items_bulk(make_items(50, seed=1))
+    returned = db.get_items()
+    methods = db.metrics()["methods"]
+    db.close()
+
+    assert len(returned) == 200
+    assert methods["get_items"]["rows"] == 200
+    assert methods["save_items"]["rows"] == 150
+    assert methods["save_items_bulk"] == {**methods["save_items_bulk"], "calls": 2, "rows": 50}
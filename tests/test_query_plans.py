@@ -0,0 +1,12 @@
+"""Hot read paths must be served by indexes (see src.store.bench.query_plans)."""
+
+import pytest
+
+from src.store.bench import check_query_plans
+
+PLANS = check_query_plans(rows=2000)
+
+
+@pytest.mark.parametrize("result", PLANS, ids=[r["query"] for r in PLANS])
+def test_query_uses_index(result):
+    assert result["ok"], "\n".join(result["plan"])
@@ -0,0 +1,67 @@
+"""Archiving items (see src.store.retention) must not disturb what stays behind."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.store import retention
+from src.store.database import Database
+from src.store.models import SensorItem
+
+
+def make_items(prefix: str, count: int) -> list[SensorItem]:
+    return [
+        SensorItem(source="rss", source_id=f"{prefix}-{i}", title=f"{prefix} item {i}", content="body " * 200)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=[False, True], ids=["serial", "concurrent"])
+def db(request, tmp_path):
+    database = Database(str(tmp_path / "signex.db"), concurrent=request.param)
+    database.init()
+    yield database
+    database.close()
+
+
+def test_archived_ids_are_not_reused(db):
+    archived_ids = db.save_items(make_items("old", 50), watch_name="news")["item_ids"]
+    analysis_id = db.save_analysis("news", archived_ids, "report.md", len(archived_ids), "default")
+
+    moved = db.archive_items(default_days=30, now=datetime.now(timezone.utc) + timedelta(days=60))
+    assert sum(moved.values()) == len(archived_ids)
+
+    new_ids = db.save_items(make_items("new", 10), watch_name="news")["item_ids"]
+    assert min(new_ids) > max(archived_ids)
+
+    reader = db._reader()
+    linked = [row[0] for row in reader.execute(
+        "SELECT item_id FROM analysis_items WHERE analysis_id = ? ORDER BY item_id", (analysis_id,)
+    )]
+    assert linked == archived_ids
+
+    since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    items = db.get_items(since=since)
+    assert sorted(item["id"] for item in items) == sorted(archived_ids + new_ids)
+    assert {item["source_id"] for item in items if item["id"] in archived_ids} == {f"old-{i}" for i in range(50)}
+
+
+def test_archive_returns_free_pages(db):
+    db.save_items(make_items("old", 500))
+    db.archive_items(default_days=30, now=datetime.now(timezone.utc) + timedelta(days=60))
+
+    assert db._reader().execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_incremental_vacuum_frees_pages_in_chunks(tmp_path):
+    db = Database(str(tmp_path / "signex.db"))
+    db.init()
+    db.save_items(make_items("old", 500))
+    db.connection.execute("DELETE FROM items")
+    db.connection.commit()
+    free = db.connection.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free > 10
+
+    assert retention.incremental_vacuum(db.connection, chunk=10) == free
+    assert db.connection.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    db.close()
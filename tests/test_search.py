@@ -0,0 +1,23 @@
+"""Full-text search (see Database.search_items)."""
+
+from src.store.database import Database
+from src.store.models import SensorItem
+
+
+def test_common_terms_rank_only_the_newest_candidates(tmp_path):
+    db = Database(str(tmp_path / "signex.db"), dedup=False)
+    db.init()
+    ids = db.save_items_bulk([
+        SensorItem(source="rss", source_id=str(i), title=f"agent {'agent ' * (i == 0)}release {i}")
+        for i in range(50)
+    ])["item_ids"]
+
+    # The best match is the oldest item, outside the newest 10 candidates
+    assert db.search_items("agent", limit=1, max_candidates=None)[0]["id"] == ids[0]
+    capped = db.search_items("agent", limit=50, max_candidates=10)
+    assert sorted(item["id"] for item in capped) == ids[-10:]
+    assert len(db.search_items("agent release", limit=50)) == 50
+    # Invalid FTS5 syntax falls back to literal terms, still capped
+    assert len(db.search_items("agent (", limit=50, max_candidates=10)) == 10
+    assert [item["id"] for item in db.search_items("release 7", watch_name=None)] == [ids[7]]
+    db.close()